@@ -1,18 +1,26 @@
 """Main entry point for Octopus Bot."""
 
 import asyncio
+import atexit
 import logging
+import queue
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
 from octopus_bot.bot import OctopusBotHandler
 from octopus_bot.config import load_config
 
 # Timed rotating file handler will be configured below
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 
 # Suppress verbose logs from external libraries
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -28,14 +36,37 @@ console_handler = logging.StreamHandler()
 console_handler.setFormatter(log_formatter)
 console_handler.setLevel(logging.INFO)
 
+# Log calls only enqueue records; a listener thread does the actual writes,
+# so the asyncio event loop never blocks on disk or console I/O.
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(
+    log_queue, file_handler, console_handler, respect_handler_level=True
+)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 root_logger = logging.getLogger()
 root_logger.setLevel(logging.INFO)
-root_logger.addHandler(file_handler)
-root_logger.addHandler(console_handler)
+root_logger.addHandler(QueueHandler(log_queue))
 
 # Module logger for this script
 logger = logging.getLogger(__name__)
 
+# Threads in the default executor used by asyncio.to_thread (disk usage reads,
+# subscriber writes); the asyncio default of cpu_count + 4 is more than needed
+EXECUTOR_WORKERS = 4
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create the bot's event loop with a bounded default executor."""
+    # uvloop's libuv-based loop is a drop-in, faster replacement where available
+    loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+    # Installed once per loop; asyncio.run() shuts it down when the loop closes
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="octo")
+    )
+    return loop
+
 
 def main():
     """Main entry point."""
@@ -51,12 +82,12 @@ def main():
 
         # Start bot
         logger.info("Bot started. Press Ctrl+C to stop.")
-        asyncio.run(bot.start())
+        asyncio.run(bot.start(), loop_factory=new_event_loop)
 
     except KeyboardInterrupt:
         logger.info("Received keyboard interrupt, shutting down...")
     except Exception as e:
-        logger.error(f"Error: {e}", exc_info=True)
+        logger.error("Error: %s", e, exc_info=True)
         sys.exit(1)
 
 
@@ -1,18 +1,28 @@
 """Telegram bot handler for Octopus Bot."""
 
 import asyncio
+import hashlib
+import io
 import json
 import logging
 import os
-from datetime import datetime
-from typing import Set
+from array import array
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Set
 
-import schedule
+import psutil
 from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from telegram.error import Forbidden
+from telegram.ext import AIORateLimiter, Application, CommandHandler, ContextTypes
 from telegram.request import HTTPXRequest
 
-from .config import BotConfig, load_config
+try:
+    from watchfiles import awatch
+except ImportError:  # optional: fall back to polling the config file
+    awatch = None
+
+from .config import BotConfig, Script, load_config
 from .server_ops import (
     get_cpu_load,
     get_disk_usage,
@@ -22,6 +32,43 @@ from .server_ops import (
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of subscribers messaged concurrently during a broadcast.
+# Kept below Telegram's global limit of ~30 messages per second.
+BROADCAST_CONCURRENCY = 20
+
+# Number of background workers delivering queued /broadcast messages
+BROADCAST_WORKERS = 8
+
+# Max /broadcast deliveries (one per subscriber) waiting for a worker
+BROADCAST_QUEUE_SIZE = 10000
+
+# Seconds shutdown waits for queued /broadcast deliveries to go out
+BROADCAST_DRAIN_TIMEOUT = 10
+
+# Max seconds /stream output is held back so later lines can join the same
+# message; it goes out sooner once a full chunk is pending or the script ends
+STREAM_FLUSH_INTERVAL = 1.0
+
+# How often (seconds) the config file's mtime is checked for changes
+CONFIG_POLL_INTERVAL = 1
+
+# Longest (seconds) watchfiles holds back a reload while the config file keeps
+# changing; normally it reloads once the file has been quiet for the debounce
+CONFIG_WATCH_MAX_DELAY = 60
+
+# Seconds to wait after a subscriber change before writing, so bursts of changes
+# (e.g. several blocked users found in one broadcast) become a single write
+SUBSCRIBERS_FLUSH_DELAY = 0.5
+
+# Header of the binary subscribers file; followed by native-endian int64 user IDs.
+# Files without it are read as the legacy JSON list format.
+SUBSCRIBERS_MAGIC = b"OCTOSUB1"
+
+
+# Characters with special meaning in Telegram's legacy Markdown (the
+# parse_mode="Markdown" used for every message), mapped to their escaped form
+_ESCAPE_TABLE = str.maketrans({c: "\\" + c for c in "_*`["})
+
 
 def escape_markdown(text: str) -> str:
     """
@@ -33,34 +80,84 @@ def escape_markdown(text: str) -> str:
     Returns:
         Escaped text safe for Markdown parsing
     """
-    # Escape underscores and asterisks which have special meaning in Markdown
-    # Order matters: escape backslashes first to avoid double escaping
-    escape_chars = [
-        ("\\", "\\\\"),  # Backslash first
-        ("_", "\\_"),  # Underscore
-        ("*", "\\*"),  # Asterisk
-        ("[", "\\["),  # Square brackets
-        ("]", "\\]"),  # Square brackets
-        ("(", "\\("),  # Parentheses
-        (")", "\\)"),  # Parentheses
-        ("`", "\\`"),  # Backtick
-        (">", "\\>"),  # Greater than
-        ("#", "\\#"),  # Hash
-        ("+", "\\+"),  # Plus
-        ("-", "\\-"),  # Minus
-        ("=", "\\="),  # Equals
-        ("|", "\\|"),  # Pipe
-        ("{", "\\{"),  # Curly braces
-        ("}", "\\}"),  # Curly braces
-        (".", "\\."),  # Period
-        ("!", "\\!"),  # Exclamation mark
-    ]
-
-    escaped_text = text
-    for char, replacement in escape_chars:
-        escaped_text = escaped_text.replace(char, replacement)
-
-    return escaped_text
+    return text.translate(_ESCAPE_TABLE)
+
+
+# /status reply templates
+_STATUS_HEADER = "📊 **Server Status**\n\n"
+_CPU_LOAD = (
+    "🖥️ **CPU Load**\n"
+    "  1min: {load[1min]:.2f}\n"
+    "  5min: {load[5min]:.2f}\n"
+    "  15min: {load[15min]:.2f}\n\n"
+)
+_CPU_ERROR = "⚠️ Could not get CPU load: {error}\n\n"
+_DISK_HEADER = "💾 **Disk Usage**\n"
+_DEVICE_LINE = "  {alert} {name}: {pct:.1f}%{extra}\n"
+_DEVICE_ALERT = " (⚠️ Alert threshold: {threshold}%)"
+_DEVICE_ERROR_LINE = "  ⚠️ {name}: Error - {error}\n"
+
+
+def _chunk_text(text: str, size: int) -> list[str]:
+    """
+    Split text into chunks of at most `size` characters, preferring line breaks.
+
+    Args:
+        text: Text to split
+        size: Maximum chunk length
+
+    Returns:
+        Non-empty chunks; a newline a chunk was split at is dropped, and lines
+        longer than `size` are split mid-line
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > size:
+        cut = text.rfind("\n", start, start + size + 1)
+        if cut == -1:
+            chunks.append(text[start : start + size])
+            start += size
+        else:
+            if cut > start:
+                chunks.append(text[start:cut])
+            start = cut + 1
+    if start < len(text):
+        chunks.append(text[start:])
+    return chunks
+
+
+def _parse_admin_ids(admin_users: str) -> frozenset[int]:
+    """
+    Parse a comma-separated list of Telegram user IDs.
+
+    Args:
+        admin_users: Value of the ADMIN_USERS environment variable
+
+    Returns:
+        Set of admin user IDs; empty if unset or malformed
+    """
+    try:
+        return frozenset(int(x.strip()) for x in admin_users.split(",") if x.strip())
+    except ValueError:
+        logger.warning("Ignoring malformed ADMIN_USERS value: %r", admin_users)
+        return frozenset()
+
+
+def _seconds_until(run_at: time) -> float:
+    """
+    Compute the delay until the next occurrence of a local time of day.
+
+    Args:
+        run_at: Time of day to run at
+
+    Returns:
+        Seconds until `run_at` today, or tomorrow if it has already passed
+    """
+    now = datetime.now()
+    target = datetime.combine(now.date(), run_at)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
 
 
 class OctopusBotHandler:
@@ -74,7 +171,13 @@ class OctopusBotHandler:
             config: Bot configuration
         """
         self.config = config
-        builder = Application.builder().token(config.telegram_token)
+        # Keep sends under Telegram's flood limits (30 msg/s overall, 20 msg/min per
+        # group) and wait out RetryAfter responses instead of failing the send
+        builder = (
+            Application.builder()
+            .token(config.telegram_token)
+            .rate_limiter(AIORateLimiter(max_retries=3))
+        )
         if config.proxy:
             logger.info("Using proxy: %s", config.proxy)
             builder = (
@@ -83,22 +186,68 @@ class OctopusBotHandler:
                 .get_updates_request(HTTPXRequest(proxy=config.proxy))
             )
         self.app = builder.build()
+        self._index_scripts()
         self.subscribers: Set[int] = set()
         self.first_subscriber: int | None = None
-        self.subscribers_file = "subscribers.json"
+        # Admin user IDs from ADMIN_USERS, parsed once
+        self._admin_ids = _parse_admin_ids(os.getenv("ADMIN_USERS", ""))
+        self.subscribers_file = "subscribers.bin"
         self._load_subscribers()
+        # Set when subscribers change; the flusher task writes them out in batches
+        self._subscribers_dirty = False
+        # Wakes the flusher task when there is something to write
+        self._subscribers_changed = asyncio.Event()
+        # Serializes writes so snapshots reach the file in order
+        self._save_lock = asyncio.Lock()
+        # Limits how many subscribers are messaged concurrently during a broadcast
+        self._send_semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+        # Pending (user_id, messages, template_ids) deliveries for the broadcast workers
+        self._broadcast_queue: asyncio.Queue[
+            tuple[int, list[tuple[str, str | None]], list[int] | None]
+        ] = asyncio.Queue(maxsize=BROADCAST_QUEUE_SIZE)
         # Chunk size for broadcast messages (chars). Read from config (default 4000).
         try:
             self.chunk_size = int(getattr(config, "broadcast_chunk_size", 4000) or 4000)
         except Exception:
             self.chunk_size = 4000
+        # Max seconds periodic script output is held before being broadcast
+        self.flush_interval = config.broadcast_flush_interval
+
+        # Periodic script timers, keyed by script name
+        self._periodic_tasks: dict[str, asyncio.Task] = {}
+        # Latest run of each periodic script. Runs are separate tasks so a config
+        # reload, which cancels the timers, doesn't cut a run short.
+        self._periodic_runs: dict[str, asyncio.Task] = {}
+        # Set by stop() to make start() shut the bot down
+        self._stop_event = asyncio.Event()
 
         # Configuration file monitoring
         self.config_file_path = os.getenv("CONFIG_FILE", "config/config.yaml")
         self.config_last_modified = self._get_file_modified_time(self.config_file_path)
+        self.config_last_hash = self._get_file_hash(self.config_file_path)
 
         self._setup_handlers()
 
+    def _index_scripts(self) -> None:
+        """Build name lookups for the configured scripts (first definition wins)."""
+        self._one_time_by_name: dict[str, Script] = {
+            s.name: s for s in reversed(self.config.one_time_scripts)
+        }
+        self._long_running_by_name: dict[str, Script] = {
+            s.name: s for s in reversed(self.config.long_running_scripts)
+        }
+        # Periodic scripts run through the streaming runner; build their Script once
+        self._periodic_by_name: dict[str, Script] = {
+            s.name: Script(name=s.name, path=s.path, long_running=True, args=s.args)
+            for s in reversed(self.config.periodic_scripts)
+        }
+        # Script lists shown in usage and error replies
+        self._one_time_names = ", ".join(s.name for s in self.config.one_time_scripts)
+        self._long_running_names = (
+            ", ".join(s.name for s in self.config.long_running_scripts)
+            or "None configured"
+        )
+
     def _get_file_modified_time(self, file_path: str) -> float:
         """Get the last modified time of a file."""
         try:
@@ -106,24 +255,68 @@ class OctopusBotHandler:
         except OSError:
             return 0
 
+    def _get_file_hash(self, file_path: str) -> bytes | None:
+        """Get a digest of a file's contents, or None if it can't be read."""
+        try:
+            with open(file_path, "rb") as f:
+                return hashlib.file_digest(f, "blake2b").digest()
+        except OSError:
+            return None
+
     def _load_subscribers(self) -> None:
-        """Load subscribers from file."""
+        """Load subscribers from file, migrating from subscribers.json if needed."""
         try:
-            if os.path.exists(self.subscribers_file):
-                with open(self.subscribers_file, "r") as f:
-                    subscriber_ids = json.load(f)
-                    self.subscribers = set(subscriber_ids)
-                    logger.info(f"Loaded {len(self.subscribers)} subscribers")
+            path = Path(self.subscribers_file)
+            if not path.exists():
+                # Fall back to the JSON file written by older versions
+                path = path.with_suffix(".json")
+            if path.exists():
+                data = path.read_bytes()
+                if data.startswith(SUBSCRIBERS_MAGIC):
+                    subscriber_ids = array("q")
+                    subscriber_ids.frombytes(data[len(SUBSCRIBERS_MAGIC) :])
+                else:
+                    subscriber_ids = json.loads(data)
+                self.subscribers = set(subscriber_ids)
+                logger.info("Loaded %d subscribers", len(self.subscribers))
         except Exception as e:
-            logger.error(f"Failed to load subscribers: {e}")
+            logger.error("Failed to load subscribers: %s", e)
+
+    def _write_subscribers(self, subscriber_ids: array) -> None:
+        """
+        Write subscriber IDs to file atomically. Blocking; runs in a worker thread.
 
-    def _save_subscribers(self) -> None:
-        """Save subscribers to file."""
+        Args:
+            subscriber_ids: Snapshot of subscriber IDs as an int64 array
+        """
         try:
-            with open(self.subscribers_file, "w") as f:
-                json.dump(list(self.subscribers), f)
+            path = Path(self.subscribers_file)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(SUBSCRIBERS_MAGIC)
+                subscriber_ids.tofile(f)
+            os.replace(tmp_path, path)
         except Exception as e:
-            logger.error(f"Failed to save subscribers: {e}")
+            logger.error("Failed to save subscribers: %s", e)
+
+    async def _save_subscribers(self) -> None:
+        """Save subscribers to file without blocking the event loop."""
+        async with self._save_lock:
+            # Snapshot on the loop thread so the set can't change mid-write
+            subscriber_ids = array("q", self.subscribers)
+            await asyncio.to_thread(self._write_subscribers, subscriber_ids)
+
+    async def _flush_subscribers(self) -> None:
+        """Save subscribers to file if they changed since the last flush."""
+        if not self._subscribers_dirty:
+            return
+        self._subscribers_dirty = False
+        await self._save_subscribers()
+
+    def _mark_subscribers_dirty(self) -> None:
+        """Schedule a write of the subscriber set by the flusher task."""
+        self._subscribers_dirty = True
+        self._subscribers_changed.set()
 
     def _setup_handlers(self) -> None:
         """Set up command handlers."""
@@ -179,7 +372,7 @@ class OctopusBotHandler:
             # Track the first subscriber
             if self.first_subscriber is None:
                 self.first_subscriber = user_id
-            self._save_subscribers()
+            self._mark_subscribers_dirty()
             await update.message.reply_text(
                 "✅ You have been subscribed to broadcast messages!"
             )
@@ -195,7 +388,7 @@ class OctopusBotHandler:
         user_id = update.effective_user.id
         if user_id in self.subscribers:
             self.subscribers.remove(user_id)
-            self._save_subscribers()
+            self._mark_subscribers_dirty()
             await update.message.reply_text(
                 "✅ You have been unsubscribed from broadcast messages."
             )
@@ -204,22 +397,168 @@ class OctopusBotHandler:
                 "ℹ️ You are not currently subscribed to broadcast messages."
             )
 
-    async def broadcast_message(self, message: str):
+    async def _prepare_templates(
+        self, messages: list[tuple[str, str | None]]
+    ) -> list[int] | None:
+        """
+        Post messages once to the broadcast origin chat so they can be copied.
+
+        Args:
+            messages: List of (text, parse_mode) tuples to post
+
+        Returns:
+            IDs of the posted messages, or None to send the texts directly
+        """
+        origin_chat_id = self.config.broadcast_origin_chat_id
+        if origin_chat_id is None or not self.subscribers:
+            return None
+        try:
+            template_ids = []
+            for text, parse_mode in messages:
+                sent = await self.app.bot.send_message(
+                    chat_id=origin_chat_id, text=text, parse_mode=parse_mode
+                )
+                template_ids.append(sent.message_id)
+            return template_ids
+        except Exception as e:
+            logger.warning(
+                "Failed to post broadcast to origin chat %s, sending directly: %s",
+                origin_chat_id,
+                e,
+            )
+            return None
+
+    async def _send_to_subscriber(
+        self,
+        user_id: int,
+        messages: list[tuple[str, str | None]],
+        template_ids: list[int] | None = None,
+    ) -> None:
+        """
+        Send a sequence of messages to a single subscriber, preserving their order.
+
+        Args:
+            user_id: Telegram chat ID of the subscriber
+            messages: List of (text, parse_mode) tuples to send
+            template_ids: IDs of the same messages in the origin chat; when given,
+                they are copied server-side instead of re-sending the texts
+        """
+        async with self._send_semaphore:
+            if template_ids is not None:
+                for message_id in template_ids:
+                    await self.app.bot.copy_message(
+                        chat_id=user_id,
+                        from_chat_id=self.config.broadcast_origin_chat_id,
+                        message_id=message_id,
+                    )
+                return
+            for text, parse_mode in messages:
+                await self.app.bot.send_message(
+                    chat_id=user_id, text=text, parse_mode=parse_mode
+                )
+
+    async def _send_to_subscribers(
+        self, messages: list[tuple[str, str | None]]
+    ) -> tuple[int, int]:
+        """
+        Send messages to all subscribers concurrently.
+
+        Each subscriber receives the messages in order; different subscribers are
+        served in parallel, bounded by the broadcast semaphore. Subscribers that
+        blocked the bot are removed.
+
+        Args:
+            messages: List of (text, parse_mode) tuples to send
+
+        Returns:
+            Tuple of (successful_sends, failed_sends) counted per subscriber
+        """
+        template_ids = await self._prepare_templates(messages)
+        # Immutable snapshot; blocked users are removed from the live set below
+        recipients = tuple(self.subscribers)
+        results = await asyncio.gather(
+            *(
+                self._send_to_subscriber(user_id, messages, template_ids)
+                for user_id in recipients
+            ),
+            return_exceptions=True,
+        )
+
         successful_sends = 0
         failed_sends = 0
-        for user_id in self.subscribers:
-            try:
-                await self.app.bot.send_message(chat_id=user_id, text=message)
-                successful_sends += 1
-            except Exception as e:
-                logger.error(f"Failed to send message to {user_id}: {e}")
+        for user_id, result in zip(recipients, results):
+            if isinstance(result, Exception):
+                self._handle_send_failure(user_id, result)
                 failed_sends += 1
-                # Remove user if bot is blocked
-                if "bot was blocked" in str(e).lower():
-                    self.subscribers.discard(user_id)
-                    self._save_subscribers()
+            else:
+                successful_sends += 1
         return successful_sends, failed_sends
 
+    def _handle_send_failure(self, user_id: int, error: Exception) -> None:
+        """
+        Log a failed delivery and drop the subscriber if the bot can't reach them.
+
+        Args:
+            user_id: Telegram chat ID of the subscriber
+            error: Exception raised while sending
+        """
+        logger.error("Failed to broadcast to user %s: %s", user_id, error)
+        # Remove user if bot is blocked or the account was deactivated
+        if isinstance(error, Forbidden):
+            self.subscribers.discard(user_id)
+            self._mark_subscribers_dirty()
+
+    async def _queue_broadcast(
+        self, messages: list[tuple[str, str | None]]
+    ) -> tuple[int, int]:
+        """
+        Queue messages for background delivery to all subscribers.
+
+        Args:
+            messages: List of (text, parse_mode) tuples to send
+
+        Returns:
+            Tuple of (queued, skipped) subscriber counts; subscribers are
+            skipped once the queue is full
+        """
+        template_ids = await self._prepare_templates(messages)
+        recipients = tuple(self.subscribers)
+        queued = 0
+        try:
+            for user_id in recipients:
+                self._broadcast_queue.put_nowait((user_id, messages, template_ids))
+                queued += 1
+        except asyncio.QueueFull:
+            logger.warning(
+                "Broadcast queue is full; skipped %d of %d subscribers",
+                len(recipients) - queued,
+                len(recipients),
+            )
+        return queued, len(recipients) - queued
+
+    async def _run_broadcast_worker(self) -> None:
+        """Deliver queued broadcast messages until cancelled."""
+        while True:
+            user_id, messages, template_ids = await self._broadcast_queue.get()
+            try:
+                await self._send_to_subscriber(user_id, messages, template_ids)
+            except Exception as e:
+                self._handle_send_failure(user_id, e)
+            finally:
+                self._broadcast_queue.task_done()
+
+    async def broadcast_message(self, message: str) -> tuple[int, int]:
+        """
+        Send a plain text message to all subscribers.
+
+        Args:
+            message: Message text
+
+        Returns:
+            Tuple of (successful_sends, failed_sends)
+        """
+        return await self._send_to_subscribers([(message, None)])
+
     async def broadcast_command(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
@@ -238,17 +577,18 @@ class OctopusBotHandler:
 
         message = "📢 **Broadcast Message**\n\n" + " ".join(context.args)
 
-        # Send broadcast to all subscribers
-        successful_sends = 0
-        failed_sends = 0
+        # Deliver in the background so the handler replies immediately
+        queued, skipped = await self._queue_broadcast([(message, None)])
 
-        await self.broadcast_message(message)
-
-        await update.message.reply_text(
-            f"✅ Broadcast sent!\n"
-            f"Successful: {successful_sends}\n"
-            f"Failed: {failed_sends}"
-        )
+        if skipped:
+            await update.message.reply_text(
+                f"⚠️ Broadcast queued for {queued} subscriber(s); "
+                f"{skipped} skipped because the delivery queue is full."
+            )
+        else:
+            await update.message.reply_text(
+                f"✅ Broadcast queued for {queued} subscriber(s)."
+            )
 
     def _is_admin_user(self, user_id: int) -> bool:
         """
@@ -260,14 +600,9 @@ class OctopusBotHandler:
         Returns:
             True if user is admin, False otherwise
         """
-        # For now, we can use environment variable or config
-        admin_users = os.getenv("ADMIN_USERS", "")
-        if admin_users:
-            try:
-                admin_ids = [int(id.strip()) for id in admin_users.split(",")]
-                return user_id in admin_ids
-            except ValueError:
-                pass
+        # Explicit admin list from the ADMIN_USERS environment variable
+        if self._admin_ids:
+            return user_id in self._admin_ids
         # Default: first user to interact with bot is admin
         if self.first_subscriber is None:
             return True  # First user is admin
@@ -284,39 +619,13 @@ class OctopusBotHandler:
         """
         # Skip if output is empty
         if not output or not output.strip():
-            logger.debug(f"Skipping broadcast for '{title}': output is empty")
+            logger.debug("Skipping broadcast for '%s': output is empty", title)
             return
 
         # Split output into chunks if too long
-        if len(output) > self.chunk_size:
-            chunks = [
-                output[i : i + self.chunk_size]
-                for i in range(0, len(output), self.chunk_size)
-            ]
-        else:
-            chunks = [output]
-
-        for user_id in self.subscribers.copy():
-            try:
-                # Send title
-                await self.app.bot.send_message(
-                    chat_id=user_id, text=f"📢 ** {title} **"
-                )
+        chunks = _chunk_text(output, self.chunk_size)
 
-                # Send output chunks
-                for i, chunk in enumerate(chunks):
-                    await self.app.bot.send_message(
-                        chat_id=user_id,
-                        text=f"```\n{chunk}\n```",
-                        parse_mode="Markdown",
-                    )
-
-            except Exception as e:
-                logger.error(f"Failed to broadcast to user {user_id}: {e}")
-                # Remove user if bot is blocked
-                if "bot was blocked" in str(e).lower():
-                    self.subscribers.discard(user_id)
-                    self._save_subscribers()
+        await self._send_to_subscribers(self._build_broadcast_messages(title, chunks))
 
     async def broadcast_chunks(
         self, title: str, chunks: list[str], send_title: bool = True
@@ -329,34 +638,39 @@ class OctopusBotHandler:
             chunks: List of output chunks (strings)
             send_title: Whether to send the title before chunks
         """
-        # Skip if chunks are empty or contain only whitespace
-        if not chunks or all(not (c and c.strip()) for c in chunks):
-            logger.debug(f"Skipping broadcast for '{title}': chunks are empty")
+        # Skip empty or whitespace-only chunks (isspace() doesn't allocate like strip())
+        chunks = [c for c in chunks if c and not c.isspace()]
+        if not chunks:
+            logger.debug("Skipping broadcast for '%s': chunks are empty", title)
             return
 
-        for user_id in self.subscribers.copy():
-            try:
-                if send_title:
-                    await self.app.bot.send_message(
-                        chat_id=user_id,
-                        text=f"📢 ** {title} **",
-                    )
+        await self._send_to_subscribers(
+            self._build_broadcast_messages(title if send_title else None, chunks)
+        )
 
-                for chunk in chunks:
-                    if not chunk or not chunk.strip():
-                        continue
-                    await self.app.bot.send_message(
-                        chat_id=user_id,
-                        text=f"```\n{chunk}\n```",
-                        parse_mode="Markdown",
-                    )
+    def _build_broadcast_messages(
+        self, title: str | None, chunks: list[str]
+    ) -> list[tuple[str, str | None]]:
+        """
+        Build the messages for a broadcast of output chunks.
 
-            except Exception as e:
-                logger.error(f"Failed to broadcast to user {user_id}: {e}")
-                # Remove user if bot is blocked
-                if "bot was blocked" in str(e).lower():
-                    self.subscribers.discard(user_id)
-                    self._save_subscribers()
+        A single chunk that fits alongside the title is sent as one message.
+
+        Args:
+            title: Plain-text title to send before the chunks, or None for no title
+            chunks: Output chunks, each sent as a code block
+
+        Returns:
+            List of (text, parse_mode) tuples to send in order
+        """
+        bodies = [f"```\n{chunk}\n```" for chunk in chunks]
+        if title is None:
+            return [(body, "Markdown") for body in bodies]
+        # Titles are plain text; this is the only place they are escaped
+        header = f"📢 *{escape_markdown(title)}*"
+        if len(bodies) == 1 and len(header) + 1 + len(bodies[0]) <= self.chunk_size:
+            return [(f"{header}\n{bodies[0]}", "Markdown")]
+        return [(header, "Markdown")] + [(body, "Markdown") for body in bodies]
 
     async def broadcast_config_reload(
         self, success: bool, error_message: str = None
@@ -374,25 +688,19 @@ class OctopusBotHandler:
             message = f"❌ **Configuration Reload Failed**\n\nFailed to reload configuration: {error_message}"
 
         # Send to all subscribers
-        for user_id in self.subscribers.copy():
-            try:
-                await self.app.bot.send_message(
-                    chat_id=user_id, text=message, parse_mode="Markdown"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Failed to send config reload notification to user {user_id}: {e}"
-                )
-                # Remove user if bot is blocked
-                if "bot was blocked" in str(e).lower():
-                    self.subscribers.discard(user_id)
-                    self._save_subscribers()
+        await self._send_to_subscribers([(message, "Markdown")])
 
     async def check_config_changes(self) -> None:
         """Check if the configuration file has been modified and reload if necessary."""
         try:
             current_modified_time = self._get_file_modified_time(self.config_file_path)
             if current_modified_time > self.config_last_modified:
+                current_hash = self._get_file_hash(self.config_file_path)
+                if current_hash == self.config_last_hash:
+                    # Touched but not edited: nothing to reload or announce
+                    self.config_last_modified = current_modified_time
+                    logger.debug("Configuration file touched but content unchanged")
+                    return
                 logger.info("Configuration file changed, reloading...")
                 try:
                     # Load new configuration
@@ -401,6 +709,8 @@ class OctopusBotHandler:
                     # Update the config and last modified time
                     self.config = new_config
                     self.config_last_modified = current_modified_time
+                    self.config_last_hash = current_hash
+                    self._index_scripts()
 
                     # Reschedule periodic scripts
                     self._reschedule_periodic_scripts()
@@ -409,13 +719,16 @@ class OctopusBotHandler:
                     await self.broadcast_config_reload(success=True)
                     logger.info("Configuration reloaded successfully")
                 except Exception as e:
-                    logger.error(f"Failed to reload configuration: {e}")
+                    logger.error("Failed to reload configuration: %s", e)
+                    # Report a broken file once; the next edit triggers a retry
+                    self.config_last_modified = current_modified_time
+                    self.config_last_hash = current_hash
                     # Broadcast error message
                     await self.broadcast_config_reload(
                         success=False, error_message=str(e)
                     )
         except Exception as e:
-            logger.error(f"Error checking config file changes: {e}")
+            logger.error("Error checking config file changes: %s", e)
 
     async def execute_periodic_script(self, script_name: str) -> None:
         """
@@ -425,68 +738,78 @@ class OctopusBotHandler:
             script_name: Name of the script to execute
         """
         # Find the script in periodic scripts
-        script = next(
-            (s for s in self.config.periodic_scripts if s.name == script_name),
-            None,
-        )
+        script_obj = self._periodic_by_name.get(script_name)
 
-        if not script:
-            logger.warning(f"Periodic script '{script_name}' not found in config")
+        if not script_obj:
+            logger.warning("Periodic script '%s' not found in config", script_name)
             return
 
         try:
-            logger.debug(f"Executing periodic script: {script_name}")
-
-            # Execute the script as streaming
-            from .config import Script
-
-            script_obj = Script(
-                name=script.name, path=script.path, long_running=True, args=script.args
-            )
+            logger.debug("Executing periodic script: %s", script_name)
 
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             title = f"Periodic Script: {script_name} ({timestamp})"
 
-            buffer = ""
+            lines: list[str] = []
+            buffer_len = 0
             sent_any = False
             first_send = True
-
-            async for line in run_script_streaming(script_obj):
-                buffer += line + "\n"
-
-                # Send buffered output in chunks
-                if len(buffer) > self.chunk_size:
+            flush_lock = asyncio.Lock()
+
+            async def flush() -> None:
+                nonlocal lines, buffer_len, sent_any, first_send
+                # Serialize flushes so timer and size triggered chunks stay in order
+                async with flush_lock:
+                    if not lines:
+                        return
+                    chunk = "\n".join(lines) + "\n"
+                    lines, buffer_len = [], 0
                     # Broadcast this chunk (send title only for first send)
-                    await self.broadcast_chunks(title, [buffer], send_title=first_send)
+                    await self.broadcast_chunks(title, [chunk], send_title=first_send)
                     first_send = False
                     sent_any = True
-                    buffer = ""
+
+            async def flush_periodically() -> None:
+                while True:
+                    await asyncio.sleep(self.flush_interval)
+                    await flush()
+
+            flusher = asyncio.create_task(flush_periodically())
+            try:
+                async for line in run_script_streaming(script_obj):
+                    lines.append(line)
+                    buffer_len += len(line) + 1
+
+                    # Send buffered output in chunks
+                    if buffer_len > self.chunk_size:
+                        await flush()
+            finally:
+                # Only cancel the timer between flushes, never mid-broadcast
+                async with flush_lock:
+                    flusher.cancel()
 
             # Send remaining buffer
-            if buffer:
-                await self.broadcast_chunks(title, [buffer], send_title=first_send)
-                sent_any = True
+            await flush()
 
             if sent_any:
                 # Final completion notification to subscribers
                 await self.broadcast_message(f"✅ Script '{script_name}' completed.")
                 logger.info(
-                    f"Periodic script '{script_name}' completed and broadcasted"
+                    "Periodic script '%s' completed and broadcasted", script_name
                 )
             else:
                 logger.debug(
-                    f"Periodic script '{script_name}' produced empty output, skipping broadcast"
+                    "Periodic script '%s' produced empty output, skipping broadcast",
+                    script_name,
                 )
 
         except Exception as e:
-            logger.error(f"Error executing periodic script '{script_name}': {e}")
+            logger.error("Error executing periodic script '%s': %s", script_name, e)
             # Broadcast error to subscribers
-            error_msg = (
-                f"Error executing periodic script '{escape_markdown(script_name)}': {e}"
-            )
-            await self.broadcast_output(
-                f"Error: {escape_markdown(script_name)}", error_msg
-            )
+            # Both end up in _build_broadcast_messages, which escapes the title;
+            # the message is sent in a code block, where escapes would show
+            error_msg = f"Error executing periodic script '{script_name}': {e}"
+            await self.broadcast_output(f"Error: {script_name}", error_msg)
 
     async def status_command(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -496,51 +819,67 @@ class OctopusBotHandler:
             # Check for arguments
             arg = context.args[0].lower() if context.args else None
 
-            status_msg = "📊 **Server Status**\n\n"
+            show_cpu = arg is None or arg == "cpu"
+            show_disks = (arg is None or arg == "du") and self.config.monitored_devices
+            devices = self.config.monitored_devices if show_disks else []
+
+            # Read CPU load and every disk concurrently, off the event loop
+            max_age = self.config.status_cache_seconds
+            readings = [
+                asyncio.to_thread(get_disk_usage, device.path, max_age)
+                for device in devices
+            ]
+            if show_cpu:
+                readings.append(asyncio.to_thread(get_cpu_load, max_age))
+            results = await asyncio.gather(*readings, return_exceptions=True)
+
+            parts = [_STATUS_HEADER]
 
             # CPU load - show only if no arg or arg is 'cpu'
-            if arg is None or arg == "cpu":
-                try:
-                    cpu_load = get_cpu_load()
-                    status_msg += (
-                        f"🖥️ **CPU Load**\n"
-                        f"  1min: {cpu_load['1min']:.2f}\n"
-                        f"  5min: {cpu_load['5min']:.2f}\n"
-                        f"  15min: {cpu_load['15min']:.2f}\n\n"
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to get CPU load: {e}")
-                    status_msg += f"⚠️ Could not get CPU load: {e}\n\n"
+            if show_cpu:
+                cpu_load = results.pop()
+                if isinstance(cpu_load, Exception):
+                    logger.error("Failed to get CPU load: %s", cpu_load)
+                    parts.append(_CPU_ERROR.format(error=cpu_load))
+                else:
+                    parts.append(_CPU_LOAD.format(load=cpu_load))
 
             # Disk usage - show only if no arg or arg is 'du'
-            if arg is None or arg == "du":
-                if self.config.monitored_devices:
-                    status_msg += "💾 **Disk Usage**\n"
-                    for device in self.config.monitored_devices:
-                        try:
-                            usage_percent, _ = get_disk_usage(device.path)
-                            alert = (
-                                "🔴" if usage_percent > device.alert_threshold else "🟢"
-                            )
-                            status_msg += f"  {alert} {escape_markdown(device.name)}: {usage_percent:.1f}%"
-                            if usage_percent > device.alert_threshold:
-                                status_msg += (
-                                    f" (⚠️ Alert threshold: {device.alert_threshold}%)"
-                                )
-                            status_msg += "\n"
-                        except Exception as e:
-                            logger.error(
-                                f"Failed to get disk usage for {device.name}: {e}"
-                            )
-                            status_msg += (
-                                f"  ⚠️ {escape_markdown(device.name)}: Error - {e}\n"
-                            )
-                    status_msg += "\n"
-
-            await update.message.reply_text(status_msg, parse_mode="Markdown")
+            if show_disks:
+                parts.append(_DISK_HEADER)
+                for device, usage_percent in zip(devices, results):
+                    name = escape_markdown(device.name)
+                    if isinstance(usage_percent, (OSError, psutil.Error)):
+                        logger.error(
+                            "Failed to get disk usage for %s: %s",
+                            device.name,
+                            usage_percent,
+                        )
+                        parts.append(
+                            _DEVICE_ERROR_LINE.format(name=name, error=usage_percent)
+                        )
+                        continue
+                    if isinstance(usage_percent, BaseException):
+                        raise usage_percent
+                    over = usage_percent > device.alert_threshold
+                    parts.append(
+                        _DEVICE_LINE.format(
+                            alert="🔴" if over else "🟢",
+                            name=name,
+                            pct=usage_percent,
+                            extra=(
+                                _DEVICE_ALERT.format(threshold=device.alert_threshold)
+                                if over
+                                else ""
+                            ),
+                        )
+                    )
+                parts.append("\n")
+
+            await update.message.reply_text("".join(parts), parse_mode="Markdown")
 
         except Exception as e:
-            logger.error(f"Error in status command: {e}")
+            logger.error("Error in status command: %s", e)
             await update.message.reply_text(f"❌ Error getting status: {e}")
 
     async def run_command(
@@ -550,25 +889,20 @@ class OctopusBotHandler:
         if not context.args:
             await update.message.reply_text(
                 "Usage: /run <script_name>\n"
-                f"Available scripts: {', '.join([s.name for s in self.config.one_time_scripts])}"
+                f"Available scripts: {self._one_time_names}"
             )
             return
 
         script_name = context.args[0]
-        script = next(
-            (s for s in self.config.one_time_scripts if s.name == script_name),
-            None,
-        )
+        script = self._one_time_by_name.get(script_name)
 
         if not script:
             await update.message.reply_text(
                 f"❌ Script '{script_name}' not found.\n"
-                f"Available scripts: {', '.join([s.name for s in self.config.one_time_scripts])}"
+                f"Available scripts: {self._one_time_names}"
             )
             return
         # Create a copy of script with combined args (default args + command args)
-        from .config import Script
-
         script_args = script.args.copy() if script.args else []
         if len(context.args) > 1:
             script_args.extend(context.args[1:])
@@ -594,17 +928,13 @@ class OctopusBotHandler:
 
             output = await run_script_once(script)
 
-            # Split output into chunks if too long (Telegram limit is ~4096 chars)
+            # Send long output as a single file (Telegram message limit is ~4096 chars)
             if len(output) > self.chunk_size:
-                chunks = [
-                    output[i : i + self.chunk_size]
-                    for i in range(0, len(output), self.chunk_size)
-                ]
-                for i, chunk in enumerate(chunks):
-                    await update.message.reply_text(
-                        f"📄 Output (part {i + 1}/{len(chunks)}):\n```\n{chunk}\n```",
-                        parse_mode="Markdown",
-                    )
+                await update.message.reply_document(
+                    document=io.BytesIO(output.encode("utf-8")),
+                    filename=f"{script_name}.txt",
+                    caption=f"✅ Script completed ({len(output)} characters of output)",
+                )
             else:
                 await update.message.reply_text(
                     f"✅ Script completed:\n```\n{output}\n```",
@@ -612,7 +942,7 @@ class OctopusBotHandler:
                 )
 
         except Exception as e:
-            logger.error(f"Error running script {script_name}: {e}")
+            logger.error("Error running script %s: %s", script_name, e)
             await update.message.reply_text(f"❌ Error running script: {e}")
 
     async def stream_command(
@@ -620,13 +950,9 @@ class OctopusBotHandler:
     ) -> None:
         """Handle /stream command - run a long-running script with streaming output."""
         if not context.args:
-            available = (
-                ", ".join([s.name for s in self.config.long_running_scripts])
-                if self.config.long_running_scripts
-                else "None configured"
-            )
             await update.message.reply_text(
-                f"Usage: /stream <script_name>\nAvailable scripts: {available}"
+                "Usage: /stream <script_name>\n"
+                f"Available scripts: {self._long_running_names}"
             )
             return
 
@@ -641,10 +967,7 @@ class OctopusBotHandler:
             update: Telegram update
             script_name: Name of the script to run
         """
-        script = next(
-            (s for s in self.config.long_running_scripts if s.name == script_name),
-            None,
-        )
+        script = self._long_running_by_name.get(script_name)
 
         if not script:
             await update.message.reply_text(
@@ -666,29 +989,82 @@ class OctopusBotHandler:
                 f"▶️ Starting long-running script '{script_name}'..."
             )
 
-            buffer = ""
-            async for line in run_script_streaming(script):
-                buffer += line + "\n"
-
-                # Send buffered output in chunks
-                if len(buffer) > self.chunk_size:
+            # A reader task collects output while replies are being sent; each send
+            # takes everything collected so far, so slow sends coalesce lines
+            # instead of queueing messages
+            loop = asyncio.get_running_loop()
+            pending: list[str] = []
+            pending_len = 0
+            first_pending_at = 0.0
+            reading = True
+            # Set when there is output to send, or the script has finished
+            has_output = asyncio.Event()
+            # Set when pending output should go out without waiting any longer
+            flush_now = asyncio.Event()
+            # Set when the sender has taken the pending output
+            drained = asyncio.Event()
+
+            async def read_output() -> None:
+                nonlocal pending_len, first_pending_at, reading
+                try:
+                    async for line in run_script_streaming(script):
+                        # Don't read ahead more than one message while a send is slow
+                        while pending_len > self.chunk_size:
+                            drained.clear()
+                            await drained.wait()
+                        if not pending:
+                            first_pending_at = loop.time()
+                        pending.append(line)
+                        pending_len += len(line) + 1
+                        has_output.set()
+                        if pending_len > self.chunk_size:
+                            flush_now.set()
+                finally:
+                    reading = False
+                    has_output.set()
+                    flush_now.set()
+
+            reader = asyncio.create_task(read_output())
+            try:
+                while True:
+                    await has_output.wait()
+                    if reading and not flush_now.is_set():
+                        # Give later lines until the oldest pending one is
+                        # STREAM_FLUSH_INTERVAL old to join the same message
+                        delay = first_pending_at + STREAM_FLUSH_INTERVAL - loop.time()
+                        if delay > 0:
+                            try:
+                                await asyncio.wait_for(flush_now.wait(), delay)
+                            except TimeoutError:
+                                pass
+                    if not pending:
+                        if not reading:
+                            break
+                        has_output.clear()
+                        continue
+                    text = "\n".join(pending)
+                    pending.clear()
+                    pending_len = 0
+                    has_output.clear()
+                    flush_now.clear()
+                    drained.set()
+                    if not reading:
+                        # Nothing more will arrive; let the loop end after this send
+                        has_output.set()
                     await update.message.reply_text(
-                        f"📄 Output:\n```\n{buffer}\n```",
+                        f"📄 Output:\n```\n{text}\n```",
                         parse_mode="Markdown",
                     )
-                    buffer = ""
-
-            # Send remaining buffer
-            if buffer:
-                await update.message.reply_text(
-                    f"📄 Output:\n```\n{buffer}\n```",
-                    parse_mode="Markdown",
-                )
+                # Raises the script's error, if any, after its output was sent
+                await reader
+            finally:
+                # Stops reading if a send failed
+                reader.cancel()
 
             await update.message.reply_text(f"✅ Script '{script_name}' completed.")
 
         except Exception as e:
-            logger.error(f"Error in streaming script {script_name}: {e}")
+            logger.error("Error in streaming script %s: %s", script_name, e)
             await update.message.reply_text(f"❌ Error: {e}")
 
     async def start(self) -> None:
@@ -711,92 +1087,126 @@ class OctopusBotHandler:
 
         # Start polling for updates
         try:
-            # Start polling
-            polling_task = asyncio.create_task(
-                self.app.updater.start_polling(
-                    allowed_updates=["message", "callback_query"]
+            # A failing task cancels its siblings and the error propagates here
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(
+                    self.app.updater.start_polling(
+                        allowed_updates=["message", "callback_query"]
+                    )
+                )
+                tasks = [
+                    tg.create_task(self._run_config_monitor()),
+                    tg.create_task(self._run_subscribers_flusher()),
+                ]
+                tasks.extend(
+                    tg.create_task(self._run_broadcast_worker())
+                    for _ in range(BROADCAST_WORKERS)
                 )
-            )
 
-            # Start scheduler task
-            scheduler_task = asyncio.create_task(self._run_scheduler())
+                # Sleep until stop() is called; a failing task cancels this wait
+                await self._stop_event.wait()
+                # Let the workers send /broadcast deliveries already promised
+                try:
+                    await asyncio.wait_for(
+                        self._broadcast_queue.join(), BROADCAST_DRAIN_TIMEOUT
+                    )
+                except TimeoutError:
+                    pass
+                for task in tasks:
+                    task.cancel()
+        finally:
+            self._clear_scheduled_jobs()
+            await self._cancel_periodic_runs()
 
-            # Start config monitoring task
-            config_monitor_task = asyncio.create_task(self._run_config_monitor())
+            dropped = self._broadcast_queue.qsize()
+            if dropped:
+                logger.warning(
+                    "Dropped %d queued broadcast deliveries on shutdown", dropped
+                )
+
+            # Persist any pending subscriber changes
+            await self._flush_subscribers()
 
-            # Keep all running indefinitely
-            await asyncio.gather(polling_task, scheduler_task, config_monitor_task)
-        finally:
-            # Cleanup on shutdown - try stopping updater in a robust way
             try:
-                # Prefer a public stop() if available
-                stop_method = getattr(self.app.updater, "stop", None)
-                if callable(stop_method):
-                    result = stop_method()
-                    if asyncio.iscoroutine(result):
-                        await result
-                else:
-                    # Fallbacks for different PTB versions
-                    stop_polling = getattr(
-                        self.app.updater, "stop_polling", None
-                    ) or getattr(self.app.updater, "_stop_polling", None)
-                    if stop_polling:
-                        res = stop_polling()
-                        if asyncio.iscoroutine(res):
-                            await res
+                if self.app.updater.running:
+                    await self.app.updater.stop()
             except Exception as e:
-                logger.warning(f"Error stopping updater: {e}")
+                logger.warning("Error stopping updater: %s", e)
 
             # Stop the application
             try:
                 await self.app.stop()
             except Exception as e:
-                logger.warning(f"Error stopping application: {e}")
+                logger.warning("Error stopping application: %s", e)
 
             try:
                 await self.app.shutdown()
             except Exception as e:
-                logger.warning(f"Error during application shutdown: {e}")
+                logger.warning("Error during application shutdown: %s", e)
 
     def _clear_scheduled_jobs(self) -> None:
-        """Clear all scheduled jobs."""
-        schedule.clear()
+        """Cancel all periodic script timers; runs in progress are left to finish."""
+        for task in self._periodic_tasks.values():
+            task.cancel()
+        self._periodic_tasks.clear()
         logger.info("Cleared all scheduled jobs")
 
+    async def _cancel_periodic_runs(self) -> None:
+        """Cancel periodic script runs in progress and wait for them to stop."""
+        runs = [task for task in self._periodic_runs.values() if not task.done()]
+        for task in runs:
+            task.cancel()
+        await asyncio.gather(*runs, return_exceptions=True)
+        self._periodic_runs.clear()
+
     def _schedule_periodic_scripts(self) -> None:
         """Schedule periodic scripts based on configuration."""
         for script in self.config.periodic_scripts:
+            if script.name in self._periodic_tasks:
+                logger.warning(
+                    "Periodic script '%s' is already scheduled; skipping duplicate",
+                    script.name,
+                )
+                continue
+
             # If a specific daily time is provided (HH:MM), schedule at that time
             if getattr(script, "time", None):
                 try:
-                    schedule.every().day.at(script.time).do(
-                        lambda script_name=script.name: asyncio.create_task(
-                            self.execute_periodic_script(script_name)
-                        )
+                    run_at = datetime.strptime(script.time, "%H:%M").time()
+                except (TypeError, ValueError) as e:
+                    # TypeError: YAML reads an unquoted 12:30 as the integer 750
+                    logger.error(
+                        "Failed to schedule '%s' at time '%s': %s",
+                        script.name,
+                        script.time,
+                        e,
+                    )
+                else:
+                    self._periodic_tasks[script.name] = asyncio.create_task(
+                        self._run_daily(script.name, run_at)
                     )
                     logger.info(
-                        f"Scheduled periodic script '{script.name}' daily at {script.time}"
+                        "Scheduled periodic script '%s' daily at %s",
+                        script.name,
+                        script.time,
                     )
                     continue
-                except Exception as e:
-                    logger.error(
-                        f"Failed to schedule '{script.name}' at time '{script.time}': {e}"
-                    )
 
             # Fallback: schedule by interval in seconds (if provided)
             if script.interval:
                 interval = script.interval
-                schedule.every(interval).seconds.do(
-                    lambda script_name=script.name: asyncio.create_task(
-                        self.execute_periodic_script(script_name)
-                    )
+                self._periodic_tasks[script.name] = asyncio.create_task(
+                    self._run_every(script.name, interval)
                 )
                 logger.info(
-                    f"Scheduled periodic script '{script.name}' every {interval} seconds"
+                    "Scheduled periodic script '%s' every %s seconds",
+                    script.name,
+                    interval,
                 )
             else:
                 logger.warning(
-                    f"Periodic script '{script.name}' has no interval or time configured; skipping"
+                    "Periodic script '%s' has no interval or time configured; skipping",
+                    script.name,
                 )
 
     def _reschedule_periodic_scripts(self) -> None:
@@ -805,20 +1215,122 @@ class OctopusBotHandler:
         self._clear_scheduled_jobs()
         self._schedule_periodic_scripts()
 
-    async def _run_scheduler(self) -> None:
-        """Run the scheduler in the background."""
+    async def _run_every(
+        self,
+        script_name: str,
+        interval: float,
+        clock: Callable[[], float] | None = None,
+        sleep: Callable[[float], Awaitable[object]] = asyncio.sleep,
+    ) -> None:
+        """
+        Run a periodic script every `interval` seconds until cancelled.
+
+        Args:
+            script_name: Name of the periodic script
+            interval: Delay between runs in seconds
+            clock: Monotonic time source; defaults to the running loop's clock
+            sleep: Coroutine function used to wait between runs
+        """
+        # Fixed-rate schedule on a monotonic clock, so run time and wall clock
+        # adjustments don't make the interval drift
+        if clock is None:
+            clock = asyncio.get_running_loop().time
+        next_run = clock() + interval
+        while True:
+            await sleep(max(0.0, next_run - clock()))
+            await self._run_periodic_safely(script_name)
+            next_run += interval
+            now = clock()
+            if next_run <= now:
+                # A run took longer than the interval: skip the missed slots
+                next_run += ((now - next_run) // interval + 1) * interval
+
+    async def _run_daily(self, script_name: str, run_at: time) -> None:
+        """
+        Run a periodic script every day at `run_at` until cancelled.
+
+        Args:
+            script_name: Name of the periodic script
+            run_at: Local time of day to run at
+        """
         while True:
-            schedule.run_pending()
-            await asyncio.sleep(1)  # Check every second if something needs to run
+            await asyncio.sleep(_seconds_until(run_at))
+            await self._run_periodic_safely(script_name)
+
+    async def _run_periodic_safely(self, script_name: str) -> None:
+        """Run a periodic script in its own task and wait for it to finish."""
+        run = self._periodic_runs.get(script_name)
+        # A run started before a config reload is still going: wait for it
+        # rather than starting the script a second time
+        if run is None or run.done():
+            run = asyncio.create_task(self._execute_periodic_safely(script_name))
+            self._periodic_runs[script_name] = run
+        # Cancelling the timer while it waits here leaves the run going
+        await asyncio.shield(run)
+
+    async def _execute_periodic_safely(self, script_name: str) -> None:
+        """Execute a periodic script, keeping its schedule alive on errors."""
+        try:
+            await self.execute_periodic_script(script_name)
+        except Exception as e:
+            logger.error("Unhandled error in periodic script '%s': %s", script_name, e)
 
     async def _run_config_monitor(self) -> None:
-        """Monitor configuration file for changes."""
+        """Monitor configuration file for changes, reloading once writes settle."""
+        if awatch is None:
+            await self._poll_config_file()
+            return
+
+        config_path = Path(self.config_file_path).resolve()
+        # watchfiles yields once no change arrived for `step` ms; `debounce` only
+        # caps how long changes are grouped. 50 ms is its default step.
+        quiet_ms = max(int(self.config.config_debounce_seconds * 1000), 50)
+        try:
+            # Watch the directory: editors often replace the file rather than write it
+            async for _changes in awatch(
+                config_path.parent,
+                watch_filter=lambda _change, path: Path(path) == config_path,
+                debounce=max(quiet_ms, CONFIG_WATCH_MAX_DELAY * 1000),
+                step=quiet_ms,
+            ):
+                await self.check_config_changes()
+        except FileNotFoundError:
+            logger.warning(
+                "Cannot watch %s, polling config file instead", config_path.parent
+            )
+            await self._poll_config_file()
+
+    async def _poll_config_file(self) -> None:
+        """Poll the configuration file's mtime, reloading once writes settle."""
+        loop = asyncio.get_running_loop()
+        pending_since: float | None = None
+        pending_mtime = 0.0
+        while True:
+            await asyncio.sleep(CONFIG_POLL_INTERVAL)
+            current_modified_time = self._get_file_modified_time(self.config_file_path)
+            if current_modified_time <= self.config_last_modified:
+                pending_since = None
+                continue
+            if pending_since is None or current_modified_time != pending_mtime:
+                # New or still-advancing change: restart the quiet period
+                pending_since = loop.time()
+                pending_mtime = current_modified_time
+                continue
+            if loop.time() - pending_since >= self.config.config_debounce_seconds:
+                pending_since = None
+                await self.check_config_changes()
+
+    async def _run_subscribers_flusher(self) -> None:
+        """Write subscriber changes to disk shortly after they happen."""
         while True:
-            await self.check_config_changes()
-            await asyncio.sleep(10)  # Check every 10 seconds
+            await self._subscribers_changed.wait()
+            # Let further changes pile up, then write them all at once
+            await asyncio.sleep(SUBSCRIBERS_FLUSH_DELAY)
+            # Cleared before writing so changes made during the write re-arm it
+            self._subscribers_changed.clear()
+            await self._flush_subscribers()
 
     async def stop(self) -> None:
-        """Stop the bot."""
+        """Stop the bot; start() then stops polling and shuts the application down."""
         logger.info("Stopping Octopus Bot...")
-        # Note: stop() is called automatically by run_polling on shutdown
-        await self.app.stop()
+        self._stop_event.set()
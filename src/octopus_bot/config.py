@@ -1,5 +1,7 @@
 """Configuration loader for Octopus Bot."""
 
+import functools
+import logging
 import os
 from dataclasses import dataclass
 from pathlib import Path
@@ -7,8 +9,15 @@ from typing import Any, List
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
 class Script:
     """Configuration for a script."""
 
@@ -23,7 +32,7 @@ class Script:
             self.args = []
 
 
-@dataclass
+@dataclass(slots=True)
 class PeriodicScript:
     """Configuration for a periodic script."""
 
@@ -40,7 +49,7 @@ class PeriodicScript:
             self.args = []
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceMonitor:
     """Configuration for device monitoring."""
 
@@ -49,7 +58,7 @@ class DeviceMonitor:
     alert_threshold: float  # e.g., 80 for 80% disk usage
 
 
-@dataclass
+@dataclass(slots=True)
 class BotConfig:
     """Bot configuration."""
 
@@ -59,7 +68,32 @@ class BotConfig:
     monitored_devices: list[DeviceMonitor]
     periodic_scripts: list[PeriodicScript]
     broadcast_chunk_size: int = 4000
+    # Seconds to collect periodic script output before broadcasting it
+    broadcast_flush_interval: float = 2.0
+    # Seconds the config file must stay unchanged before a hot-reload
+    config_debounce_seconds: float = 3.0
+    # Seconds /status may reuse previous CPU and disk readings
+    status_cache_seconds: float = 2.0
     proxy: str | None = None  # HTTP/SOCKS5 proxy URL, e.g. "socks5://host:port"
+    # Chat that broadcasts are posted to once and then copied from, if set
+    broadcast_origin_chat_id: int | None = None
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_yaml(path: str, mtime_ns: int, size: int) -> Any:
+    """
+    Parse a YAML file, reusing the result while the file is unchanged.
+
+    Args:
+        path: Resolved path of the file
+        mtime_ns: Modification time of the file, part of the cache key
+        size: Size of the file, part of the cache key
+
+    Returns:
+        Parsed YAML document (treat as read-only, it may be shared)
+    """
+    with open(path) as f:
+        return yaml.load(f, Loader=SafeLoader)
 
 
 def load_config(config_path: str | None = None) -> BotConfig:
@@ -84,8 +118,8 @@ def load_config(config_path: str | None = None) -> BotConfig:
     if not config_file.exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
-    with open(config_file) as f:
-        data = yaml.safe_load(f)
+    stat = config_file.stat()
+    data = _parse_yaml(str(config_file.resolve()), stat.st_mtime_ns, stat.st_size)
 
     if not data:
         raise ValueError("Config file is empty")
@@ -144,8 +178,17 @@ def load_config(config_path: str | None = None) -> BotConfig:
             )
         )
 
+    # Scripts are not stat()ed before each run, so report missing ones up front
+    for script in long_running_scripts + one_time_scripts + periodic_scripts:
+        if not Path(script.path).exists():
+            logger.warning("Script '%s' not found: %s", script.name, script.path)
+
     proxy = os.getenv("PROXY_URL") or data.get("proxy") or None
 
+    broadcast_origin_chat_id = data.get("broadcast_origin_chat_id")
+    if broadcast_origin_chat_id is not None:
+        broadcast_origin_chat_id = int(broadcast_origin_chat_id)
+
     return BotConfig(
         telegram_token=telegram_token,
         long_running_scripts=long_running_scripts,
@@ -153,5 +196,9 @@ def load_config(config_path: str | None = None) -> BotConfig:
         monitored_devices=monitored_devices,
         periodic_scripts=periodic_scripts,
         broadcast_chunk_size=int(data.get("broadcast_chunk_size", 4000)),
+        broadcast_flush_interval=float(data.get("broadcast_flush_interval", 2.0)),
+        config_debounce_seconds=float(data.get("config_debounce_seconds", 3.0)),
+        status_cache_seconds=float(data.get("status_cache_seconds", 2.0)),
         proxy=proxy,
+        broadcast_origin_chat_id=broadcast_origin_chat_id,
     )
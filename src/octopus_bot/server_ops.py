@@ -1,9 +1,11 @@
 """Server operations module for executing scripts and gathering system info."""
 
 import asyncio
+import contextlib
 import logging
 import os
 import subprocess
+import time
 from pathlib import Path
 from typing import AsyncGenerator
 
@@ -13,6 +15,17 @@ from .config import Script
 
 logger = logging.getLogger(__name__)
 
+# Max bytes read from a script's output pipe per await
+STREAM_READ_SIZE = 65536
+
+# StreamReader buffer limit for script output. The pipe is only paused once
+# twice this much is buffered, so chatty scripts aren't throttled at 128 KiB.
+PIPE_BUFFER_LIMIT = 1 << 20
+
+# Last readings with their time.monotonic() timestamps, reused within max_age
+_disk_cache: dict[str, tuple[float, float]] = {}
+_cpu_cache: tuple[float, dict[str, float]] | None = None
+
 
 async def run_script_streaming(
     script: Script,
@@ -31,8 +44,7 @@ async def run_script_streaming(
         RuntimeError: If script execution fails
     """
     script_path = Path(script.path)
-    if not script_path.exists():
-        raise FileNotFoundError(f"Script not found: {script.path}")
+    process = None
 
     try:
         # Include script arguments if provided
@@ -42,25 +54,48 @@ async def run_script_streaming(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.STDOUT,
+            limit=PIPE_BUFFER_LIMIT,
         )
 
-        while True:
-            line = await process.stdout.readline()
-            if not line:
-                break
-
-            yield line.decode("utf-8", errors="replace").rstrip()
+        # Read whatever output is available and split it into lines ourselves,
+        # rather than one readline() round-trip per line
+        pending = bytearray()
+        while chunk := await process.stdout.read(STREAM_READ_SIZE):
+            pending += chunk
+            end = pending.rfind(b"\n")
+            if end < 0:
+                continue
+            complete = pending[:end].decode("utf-8", errors="replace")
+            del pending[: end + 1]
+            for line in complete.split("\n"):
+                yield line.rstrip()
+
+        if pending:
+            yield pending.decode("utf-8", errors="replace").rstrip()
 
         await process.wait()
 
         if process.returncode != 0:
             logger.warning(
-                f"Script {script.name} exited with code {process.returncode} started as {cmd}"
+                "Script %s exited with code %s started as %s",
+                script.name,
+                process.returncode,
+                cmd,
             )
 
+    except FileNotFoundError as e:
+        # Checked here rather than with a stat() before every run
+        raise FileNotFoundError(f"Script not found: {script.path}") from e
     except Exception as e:
-        logger.error(f"Error running script {script.name}: {e}")
+        logger.error("Error running script %s: %s", script.name, e)
         raise RuntimeError(f"Failed to run script {script.name}") from e
+    finally:
+        # The caller stopped early (cancelled, closed the generator or failed):
+        # don't leave the script running or unreaped
+        if process is not None and process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+            await process.wait()
 
 
 async def run_script_once(script: Script) -> str:
@@ -78,8 +113,6 @@ async def run_script_once(script: Script) -> str:
         RuntimeError: If script execution fails
     """
     script_path = Path(script.path)
-    if not script_path.exists():
-        raise FileNotFoundError(f"Script not found: {script.path}")
 
     try:
         # Include script arguments if provided
@@ -89,6 +122,7 @@ async def run_script_once(script: Script) -> str:
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.STDOUT,
+            limit=PIPE_BUFFER_LIMIT,
         )
 
         stdout, _ = await result.communicate()
@@ -96,51 +130,69 @@ async def run_script_once(script: Script) -> str:
 
         if result.returncode != 0:
             logger.warning(
-                f"Script {script.name} exited with code {result.returncode} run as {cmd}"
+                "Script %s exited with code %s run as %s",
+                script.name,
+                result.returncode,
+                cmd,
             )
 
         return output
 
+    except FileNotFoundError as e:
+        # Checked here rather than with a stat() before every run
+        raise FileNotFoundError(f"Script not found: {script.path}") from e
     except Exception as e:
-        logger.error(f"Error running script {script.name}: {e}")
+        logger.error("Error running script %s: %s", script.name, e)
         raise RuntimeError(f"Failed to run script {script.name}") from e
 
 
-def get_disk_usage(device_path: str) -> tuple[float, float]:
+def get_disk_usage(device_path: str, max_age: float = 0) -> float:
     """
     Get disk usage for a device.
 
     Args:
         device_path: Path to the device or mount point
+        max_age: Seconds a previous reading for the same path may be reused
 
     Returns:
-        Tuple of (usage_percent, free_percent)
+        Used space in percent
 
     Raises:
-        RuntimeError: If unable to get disk usage
+        OSError: If the path doesn't exist or can't be accessed
+        psutil.Error: If psutil fails to read the usage
     """
-    try:
-        usage = psutil.disk_usage(device_path)
-        return usage.percent, 100 - usage.percent
-    except Exception as e:
-        logger.error(f"Error getting disk usage for {device_path}: {e}")
-        raise RuntimeError(f"Failed to get disk usage for {device_path}") from e
+    now = time.monotonic()
+    cached = _disk_cache.get(device_path)
+    if cached is not None and now - cached[0] < max_age:
+        return cached[1]
+    usage_percent = psutil.disk_usage(device_path).percent
+    _disk_cache[device_path] = (now, usage_percent)
+    return usage_percent
 
 
-def get_cpu_load() -> dict[str, float]:
+def get_cpu_load(max_age: float = 0) -> dict[str, float]:
     """
     Get CPU load averages.
 
+    Args:
+        max_age: Seconds a previous reading may be reused
+
     Returns:
         Dictionary with 1min, 5min, 15min load averages
     """
+    global _cpu_cache
+    now = time.monotonic()
+    if _cpu_cache is not None and now - _cpu_cache[0] < max_age:
+        return dict(_cpu_cache[1])
     try:
         load = os.getloadavg()
-        return {
+        result = {
             "1min": load[0],
             "5min": load[1],
             "15min": load[2],
         }
+        _cpu_cache = (now, result)
+        return dict(result)
     except Exception as e:
-        logger.error(f"Error getting CPU load: {e}")
+        logger.error("Error getting CPU load: %s", e)
         raise RuntimeError("Failed to get CPU load") from e
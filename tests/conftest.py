@@ -1,7 +1,48 @@
 """Pytest configuration."""
 
+import os
+import shutil
 import sys
 from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
 
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+class BuilderStub:
+    """Stand-in for ApplicationBuilder whose build() returns a mock Application."""
+
+    def __init__(self):
+        self.app = MagicMock()
+
+    def token(self, token):
+        return self
+
+    def rate_limiter(self, rate_limiter):
+        return self
+
+    def request(self, request):
+        return self
+
+    def get_updates_request(self, request):
+        return self
+
+    def build(self):
+        return self.app
+
+
+@pytest.fixture(autouse=True)
+def stub_app_builder(monkeypatch):
+    """Give every handler a fresh mock Application instead of a real one."""
+    monkeypatch.setattr("octopus_bot.bot.Application.builder", BuilderStub)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cleanup_tmp(tmp_path_factory):
+    """Remove this run's temporary directories; set OCTOPUS_TESTS_KEEP_TMP to keep them."""
+    yield
+    if not os.getenv("OCTOPUS_TESTS_KEEP_TMP"):
+        shutil.rmtree(tmp_path_factory.getbasetemp(), ignore_errors=True)
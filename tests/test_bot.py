@@ -3,20 +3,19 @@
 import asyncio
 import json
 import os
-import tempfile
+from dataclasses import replace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from telegram import User
-from telegram.ext import Application, CommandHandler
+from telegram.error import Forbidden
 
-from octopus_bot.bot import OctopusBotHandler
+from octopus_bot.bot import SUBSCRIBERS_MAGIC, OctopusBotHandler, _chunk_text, escape_markdown
 from octopus_bot.config import BotConfig, DeviceMonitor, PeriodicScript, Script
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_config():
-    """Create a mock configuration for testing."""
+    """Create a mock configuration shared by all tests; use replace() to vary it."""
     return BotConfig(
         telegram_token="test_token",
         long_running_scripts=[],
@@ -27,233 +26,708 @@ def mock_config():
 
 
 @pytest.fixture
-def temp_subscribers_file():
-    """Create a temporary subscribers file for testing."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as f:
-        temp_file = f.name
-    
-    yield temp_file
-    
-    # Cleanup
-    if os.path.exists(temp_file):
-        os.unlink(temp_file)
-
-
-def test_init_with_subscribers_file(mock_config):
+def bot(mock_config):
+    """Create a handler for mock_config; its mock Application is bot.app."""
+    return OctopusBotHandler(mock_config)
+
+
+@pytest.fixture
+def temp_subscribers_file(tmp_path):
+    """Create an empty subscribers file for testing."""
+    subscribers_file = tmp_path / "subscribers.bin"
+    subscribers_file.touch()
+    return subscribers_file
+
+
+def test_init_with_subscribers_file(bot):
     """Test bot initialization with subscribers file."""
-    with patch("octopus_bot.bot.Application.builder") as mock_builder:
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        # Create bot with custom subscribers file
-        bot = OctopusBotHandler(mock_config)
-        
-        # Test that subscribers is initialized as empty set
-        assert isinstance(bot.subscribers, set)
-        assert len(bot.subscribers) == 0
-
-
-def test_load_subscribers_success(mock_config, temp_subscribers_file):
-    """Test loading subscribers from file."""
+    # Test that subscribers is initialized as empty set
+    assert isinstance(bot.subscribers, set)
+    assert len(bot.subscribers) == 0
+
+
+def test_load_subscribers_success(bot, temp_subscribers_file):
+    """Test loading subscribers from a legacy JSON file."""
     # Create a file with some subscriber IDs
     subscriber_ids = [123456789, 987654321]
     with open(temp_subscribers_file, "w") as f:
         json.dump(subscriber_ids, f)
-    
-    with patch("octopus_bot.bot.Application.builder") as mock_builder:
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        # Create bot with custom subscribers file
-        bot = OctopusBotHandler(mock_config)
-        bot.subscribers_file = temp_subscribers_file
-        bot._load_subscribers()
-        
-        assert len(bot.subscribers) == 2
-        assert 123456789 in bot.subscribers
-        assert 987654321 in bot.subscribers
-
-
-def test_load_subscribers_file_not_found(mock_config):
+
+    bot.subscribers_file = temp_subscribers_file
+    bot._load_subscribers()
+
+    assert len(bot.subscribers) == 2
+    assert 123456789 in bot.subscribers
+    assert 987654321 in bot.subscribers
+
+
+def test_load_subscribers_file_not_found(bot):
     """Test loading subscribers when file doesn't exist."""
-    with patch("octopus_bot.bot.Application.builder") as mock_builder:
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        # Create bot with non-existent subscribers file
-        bot = OctopusBotHandler(mock_config)
-        bot.subscribers_file = "/nonexistent/file.json"
-        bot._load_subscribers()
-        
-        # Should still have empty subscribers
-        assert len(bot.subscribers) == 0
-
-
-def test_save_subscribers_success(mock_config, temp_subscribers_file):
+    bot.subscribers_file = "/nonexistent/file.json"
+    bot._load_subscribers()
+
+    # Should still have empty subscribers
+    assert len(bot.subscribers) == 0
+
+
+async def test_save_subscribers_success(bot, mock_config, temp_subscribers_file):
     """Test saving subscribers to file."""
-    with patch("octopus_bot.bot.Application.builder") as mock_builder:
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        # Create bot with custom subscribers file
-        bot = OctopusBotHandler(mock_config)
-        bot.subscribers_file = temp_subscribers_file
-        bot.subscribers = {123456789, 987654321}
-        bot._save_subscribers()
-        
-        # Check that file was created with correct data
-        with open(temp_subscribers_file, "r") as f:
-            saved_ids = json.load(f)
-        
-        assert set(saved_ids) == bot.subscribers
-
-
-def test_subscribe_command_new_user(mock_config):
-    """Test subscribe command for new user."""
-    with patch("octopus_bot.bot.Application.builder") as mock_builder:
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        bot = OctopusBotHandler(mock_config)
-        bot._save_subscribers = MagicMock()  # Mock file saving
-        
-        # Create mock update and context
-        mock_update = MagicMock()
-        mock_update.effective_user.id = 123456789
-        mock_update.message.reply_text = AsyncMock()
-        
-        mock_context = MagicMock()
-        
-        # Run subscribe command
-        asyncio.run(bot.subscribe_command(mock_update, mock_context))
-        
-        # Check that user was added to subscribers
-        assert 123456789 in bot.subscribers
-        bot._save_subscribers.assert_called_once()
-        mock_update.message.reply_text.assert_called_once_with(
-            "✅ You have been subscribed to broadcast messages!"
-        )
-
-
-def test_subscribe_command_existing_user(mock_config):
-    """Test subscribe command for existing user."""
-    with patch("octopus_bot.bot.Application.builder") as mock_builder:
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        bot = OctopusBotHandler(mock_config)
-        bot._save_subscribers = MagicMock()  # Mock file saving
-        bot.subscribers = {123456789}  # User already subscribed
-        
-        # Create mock update and context
-        mock_update = MagicMock()
-        mock_update.effective_user.id = 123456789
-        mock_update.message.reply_text = AsyncMock()
-        
-        mock_context = MagicMock()
-        
-        # Run subscribe command
-        asyncio.run(bot.subscribe_command(mock_update, mock_context))
-        
-        # Check that user is still in subscribers (no change)
-        assert len(bot.subscribers) == 1
-        assert 123456789 in bot.subscribers
-        bot._save_subscribers.assert_not_called()
-        mock_update.message.reply_text.assert_called_once_with(
-            "ℹ️ You are already subscribed to broadcast messages."
-        )
-
-
-def test_unsubscribe_command_existing_user(mock_config):
-    """Test unsubscribe command for existing user."""
-    with patch("octopus_bot.bot.Application.builder") as mock_builder:
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        bot = OctopusBotHandler(mock_config)
-        bot._save_subscribers = MagicMock()  # Mock file saving
-        bot.subscribers = {123456789}  # User subscribed
-        
-        # Create mock update and context
-        mock_update = MagicMock()
-        mock_update.effective_user.id = 123456789
-        mock_update.message.reply_text = AsyncMock()
-        
-        mock_context = MagicMock()
-        
-        # Run unsubscribe command
-        asyncio.run(bot.unsubscribe_command(mock_update, mock_context))
-        
-        # Check that user was removed from subscribers
-        assert len(bot.subscribers) == 0
-        bot._save_subscribers.assert_called_once()
-        mock_update.message.reply_text.assert_called_once_with(
-            "✅ You have been unsubscribed from broadcast messages."
-        )
-
-
-def test_unsubscribe_command_nonexistent_user(mock_config):
-    """Test unsubscribe command for user not subscribed."""
-    with patch("octopus_bot.bot.Application.builder") as mock_builder:
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        bot = OctopusBotHandler(mock_config)
-        bot._save_subscribers = MagicMock()  # Mock file saving
-        bot.subscribers = set()  # No subscribers
-        
-        # Create mock update and context
-        mock_update = MagicMock()
-        mock_update.effective_user.id = 123456789
-        mock_update.message.reply_text = AsyncMock()
-        
-        mock_context = MagicMock()
-        
-        # Run unsubscribe command
-        asyncio.run(bot.unsubscribe_command(mock_update, mock_context))
-        
-        # Check that subscribers is still empty
-        assert len(bot.subscribers) == 0
-        bot._save_subscribers.assert_not_called()
-        mock_update.message.reply_text.assert_called_once_with(
-            "ℹ️ You are not currently subscribed to broadcast messages."
-        )
-
-
-def test_is_admin_user_with_env_var(mock_config):
+    bot.subscribers_file = temp_subscribers_file
+    bot.subscribers = {123456789, 987654321}
+    await bot._save_subscribers()
+
+    # Check that file was created with correct data
+    with open(temp_subscribers_file, "rb") as f:
+        data = f.read()
+    assert data.startswith(SUBSCRIBERS_MAGIC)
+    assert len(data) == len(SUBSCRIBERS_MAGIC) + 2 * 8
+
+    # Check that a fresh handler reads it back
+    reloaded = OctopusBotHandler(mock_config)
+    reloaded.subscribers_file = temp_subscribers_file
+    reloaded._load_subscribers()
+
+    assert reloaded.subscribers == bot.subscribers
+
+
+async def test_flush_subscribers_writes_only_when_dirty(bot, temp_subscribers_file):
+    """Test that pending subscriber changes are flushed once."""
+    bot.subscribers_file = temp_subscribers_file
+    bot.subscribers = {123456789}
+
+    # Nothing pending: file is left untouched
+    await bot._flush_subscribers()
+    assert os.path.getsize(temp_subscribers_file) == 0
+
+    bot._subscribers_dirty = True
+    await bot._flush_subscribers()
+
+    bot.subscribers = set()
+    bot._load_subscribers()
+    assert bot.subscribers == {123456789}
+    assert bot._subscribers_dirty is False
+
+
+async def test_subscribers_flusher_writes_after_change(bot, temp_subscribers_file, monkeypatch):
+    """Test that the flusher wakes on a change and writes it out."""
+    monkeypatch.setattr("octopus_bot.bot.SUBSCRIBERS_FLUSH_DELAY", 0)
+    bot.subscribers_file = temp_subscribers_file
+
+    flusher = asyncio.create_task(bot._run_subscribers_flusher())
+    bot.subscribers.add(123456789)
+    bot._mark_subscribers_dirty()
+    for _ in range(100):
+        if os.path.getsize(temp_subscribers_file):
+            break
+        await asyncio.sleep(0.01)
+    flusher.cancel()
+
+    assert not bot._subscribers_changed.is_set()
+    bot.subscribers = set()
+    bot._load_subscribers()
+    assert bot.subscribers == {123456789}
+
+
+@pytest.mark.parametrize(
+    "initial, command, expected, reply, dirty",
+    [
+        (set(), "subscribe", {123456789}, "✅ You have been subscribed to broadcast messages!", True),
+        ({123456789}, "subscribe", {123456789}, "ℹ️ You are already subscribed to broadcast messages.", False),
+        ({123456789}, "unsubscribe", set(), "✅ You have been unsubscribed from broadcast messages.", True),
+        (set(), "unsubscribe", set(), "ℹ️ You are not currently subscribed to broadcast messages.", False),
+    ],
+    ids=["subscribe-new", "subscribe-existing", "unsubscribe-existing", "unsubscribe-nonexistent"],
+)
+async def test_subscription_commands(bot, initial, command, expected, reply, dirty):
+    """Test /subscribe and /unsubscribe for subscribed and unsubscribed users."""
+    bot.subscribers = set(initial)
+
+    # Create mock update and context
+    mock_update = MagicMock()
+    mock_update.effective_user.id = 123456789
+    mock_update.message.reply_text = AsyncMock()
+
+    mock_context = MagicMock()
+
+    await getattr(bot, f"{command}_command")(mock_update, mock_context)
+
+    assert bot.subscribers == expected
+    # Only an actual change schedules a write
+    assert bot._subscribers_dirty is dirty
+    mock_update.message.reply_text.assert_called_once_with(reply)
+
+
+def test_is_admin_user_with_env_var(mock_config, monkeypatch):
     """Test admin user check with environment variable."""
-    with patch("octopus_bot.bot.Application.builder") as mock_builder, \
-         patch.dict(os.environ, {"ADMIN_USERS": "123456789,987654321"}, clear=True):
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        bot = OctopusBotHandler(mock_config)
-        
-        # Test admin user
-        assert bot._is_admin_user(123456789) is True
-        assert bot._is_admin_user(987654321) is True
-        
-        # Test non-admin user
-        assert bot._is_admin_user(111111111) is False
-
-
-def test_is_admin_user_default_first_user(mock_config):
+    monkeypatch.setenv("ADMIN_USERS", "123456789,987654321")
+    bot = OctopusBotHandler(mock_config)
+
+    # Test admin user
+    assert bot._is_admin_user(123456789) is True
+    assert bot._is_admin_user(987654321) is True
+
+    # Test non-admin user
+    assert bot._is_admin_user(111111111) is False
+
+
+def test_is_admin_user_malformed_env_var_falls_back(mock_config, monkeypatch):
+    """Test that a malformed ADMIN_USERS falls back to the first-user rule."""
+    monkeypatch.setenv("ADMIN_USERS", "123456789,not-a-number")
+    bot = OctopusBotHandler(mock_config)
+    bot.first_subscriber = 555
+
+    assert bot._is_admin_user(555) is True
+    assert bot._is_admin_user(123456789) is False
+
+
+def test_is_admin_user_default_first_user(mock_config, monkeypatch):
     """Test admin user check with default first user behavior."""
-    with patch("octopus_bot.bot.Application.builder") as mock_builder, \
-         patch.dict(os.environ, {}, clear=True):  # No ADMIN_USERS
-        mock_app = MagicMock()
-        mock_builder.return_value.token.return_value.build.return_value = mock_app
-        
-        bot = OctopusBotHandler(mock_config)
-        
-        # When no first subscriber, first user should be admin
-        assert bot._is_admin_user(123456789) is True
-        
-        # Set first subscriber
-        bot.first_subscriber = 123456789
-        
-        # First user should still be admin
-        assert bot._is_admin_user(123456789) is True
-        
-        # Other users should not be admin
-        assert bot._is_admin_user(987654321) is False
\ No newline at end of file
+    monkeypatch.delenv("ADMIN_USERS", raising=False)
+    bot = OctopusBotHandler(mock_config)
+
+    # When no first subscriber, first user should be admin
+    assert bot._is_admin_user(123456789) is True
+
+    # Set first subscriber
+    bot.first_subscriber = 123456789
+
+    # First user should still be admin
+    assert bot._is_admin_user(123456789) is True
+
+    # Other users should not be admin
+    assert bot._is_admin_user(987654321) is False
+
+
+async def test_broadcast_output_sends_to_all_subscribers_in_order(bot):
+    """Test that broadcast output reaches every subscriber with title first."""
+    bot.app.bot.send_message = AsyncMock()
+    bot.subscribers = {111, 222, 333}
+    bot.chunk_size = 4
+
+    await bot.broadcast_output("Title", "abcdefgh")
+
+    calls = bot.app.bot.send_message.call_args_list
+    assert len(calls) == 9
+    assert {c.kwargs["parse_mode"] for c in calls} == {"Markdown"}
+    for user_id in (111, 222, 333):
+        texts = [c.kwargs["text"] for c in calls if c.kwargs["chat_id"] == user_id]
+        assert texts == ["📢 *Title*", "```\nabcd\n```", "```\nefgh\n```"]
+
+
+async def test_periodic_error_title_is_escaped_once(bot):
+    """Test that a failing periodic script's name is escaped once in the broadcast title."""
+    bot._periodic_by_name = {"disk_check": Script(name="disk_check", path="./x.sh")}
+    bot.broadcast_output = AsyncMock()
+
+    with patch("octopus_bot.bot.run_script_streaming", side_effect=RuntimeError("boom")):
+        await bot.execute_periodic_script("disk_check")
+
+    bot.broadcast_output.assert_awaited_once_with(
+        "Error: disk_check", "Error executing periodic script 'disk_check': boom"
+    )
+    header = bot._build_broadcast_messages("Error: disk_check", ["a", "b"])[0]
+    assert header == ("📢 *Error: disk\\_check*", "Markdown")
+
+
+async def test_broadcast_output_folds_title_into_single_chunk(bot):
+    """Test that a short output is sent together with its title as one message."""
+    bot.app.bot.send_message = AsyncMock()
+    bot.subscribers = {111}
+
+    await bot.broadcast_output("disk_check", "output")
+
+    bot.app.bot.send_message.assert_called_once_with(
+        chat_id=111,
+        text="📢 *disk\\_check*\n```\noutput\n```",
+        parse_mode="Markdown",
+    )
+
+
+async def test_broadcast_output_copies_from_origin_chat():
+    """Test that broadcasts are posted once to the origin chat and copied to subscribers."""
+    config = BotConfig(
+        telegram_token="test_token",
+        long_running_scripts=[],
+        one_time_scripts=[],
+        monitored_devices=[],
+        periodic_scripts=[],
+        broadcast_origin_chat_id=-100,
+    )
+    bot = OctopusBotHandler(config)
+    bot.app.bot.send_message = AsyncMock(
+        side_effect=[MagicMock(message_id=1), MagicMock(message_id=2)]
+    )
+    bot.app.bot.copy_message = AsyncMock()
+    bot.subscribers = {111, 222}
+    # Long enough that the title is sent as a separate message
+    bot.chunk_size = 8
+
+    await bot.broadcast_output("Title", "output")
+
+    # Each message is uploaded once, to the origin chat only
+    assert [c.kwargs["chat_id"] for c in bot.app.bot.send_message.call_args_list] == [-100, -100]
+    for user_id in (111, 222):
+        copied = [
+            c.kwargs["message_id"]
+            for c in bot.app.bot.copy_message.call_args_list
+            if c.kwargs["chat_id"] == user_id
+        ]
+        assert copied == [1, 2]
+
+
+async def test_periodic_output_is_flushed_on_interval(monkeypatch):
+    """Test that periodic output is broadcast after the flush interval even if small."""
+    config = BotConfig(
+        telegram_token="test_token",
+        long_running_scripts=[],
+        one_time_scripts=[],
+        monitored_devices=[],
+        periodic_scripts=[PeriodicScript(name="job", path="./job.sh", interval=60)],
+        broadcast_flush_interval=0.05,
+    )
+
+    async def fake_run_script_streaming(script):
+        yield "first"
+        yield "second"
+        await asyncio.sleep(0.2)
+        yield "third"
+
+    monkeypatch.setattr(
+        "octopus_bot.bot.run_script_streaming", fake_run_script_streaming
+    )
+    bot = OctopusBotHandler(config)
+    bot.broadcast_chunks = AsyncMock()
+    bot.broadcast_message = AsyncMock()
+
+    await bot.execute_periodic_script("job")
+
+    calls = bot.broadcast_chunks.call_args_list
+    assert [c.args[1] for c in calls] == [["first\nsecond\n"], ["third\n"]]
+    assert [c.kwargs["send_title"] for c in calls] == [True, False]
+    bot.broadcast_message.assert_called_once()
+
+
+async def test_broadcast_message_removes_blocked_users(bot):
+    """Test that users who blocked the bot are dropped during a broadcast."""
+
+    async def fake_send_message(chat_id, text, parse_mode=None):
+        if chat_id == 222:
+            raise Forbidden("Forbidden: bot was blocked by the user")
+        if chat_id == 333:
+            raise Exception("Timed out")
+
+    bot.app.bot.send_message = AsyncMock(side_effect=fake_send_message)
+    bot.subscribers = {111, 222, 333}
+
+    successful, failed = await bot.broadcast_message("hello")
+
+    # Only the user who blocked the bot is dropped; other errors are transient
+    assert (successful, failed) == (1, 2)
+    assert bot.subscribers == {111, 333}
+    assert bot._subscribers_dirty is True
+
+
+async def test_run_command_sends_long_output_as_document():
+    """Test that output longer than the chunk size is sent as one file."""
+    config = BotConfig(
+        telegram_token="test_token",
+        long_running_scripts=[],
+        one_time_scripts=[Script(name="report", path="./scripts/report.sh")],
+        monitored_devices=[],
+        periodic_scripts=[],
+    )
+    long_output = "x" * 10000
+    bot = OctopusBotHandler(config)
+
+    mock_update = MagicMock()
+    mock_update.message.reply_text = AsyncMock()
+    mock_update.message.reply_document = AsyncMock()
+
+    mock_context = MagicMock()
+    mock_context.args = ["report"]
+
+    with patch("octopus_bot.bot.run_script_once", new=AsyncMock(return_value=long_output)):
+        await bot.run_command(mock_update, mock_context)
+
+    # Only the "running" notice goes out as text
+    mock_update.message.reply_text.assert_called_once()
+    mock_update.message.reply_document.assert_called_once()
+    kwargs = mock_update.message.reply_document.call_args.kwargs
+    assert kwargs["filename"] == "report.txt"
+    assert kwargs["document"].getvalue() == long_output.encode()
+
+
+async def test_broadcast_command_queues_and_workers_deliver(bot):
+    """Test that /broadcast replies at once and workers deliver in the background."""
+    bot.app.bot.send_message = AsyncMock()
+    bot.subscribers = {111, 222}
+    bot.first_subscriber = 111
+
+    mock_update = MagicMock()
+    mock_update.effective_user.id = 111
+    mock_update.message.reply_text = AsyncMock()
+
+    mock_context = MagicMock()
+    mock_context.args = ["hello", "world"]
+
+    await bot.broadcast_command(mock_update, mock_context)
+    # Nothing has been sent yet, only queued
+    assert bot.app.bot.send_message.call_count == 0
+    assert bot._broadcast_queue.qsize() == 2
+
+    worker = asyncio.create_task(bot._run_broadcast_worker())
+    await bot._broadcast_queue.join()
+    worker.cancel()
+
+    mock_update.message.reply_text.assert_called_once_with(
+        "✅ Broadcast queued for 2 subscriber(s)."
+    )
+    sent_to = {c.kwargs["chat_id"] for c in bot.app.bot.send_message.call_args_list}
+    assert sent_to == {111, 222}
+
+
+async def test_broadcast_command_reports_subscribers_skipped_when_queue_is_full(
+    mock_config, monkeypatch
+):
+    """Test that /broadcast queues what fits and says how many subscribers were skipped."""
+    monkeypatch.setattr("octopus_bot.bot.BROADCAST_QUEUE_SIZE", 2)
+    bot = OctopusBotHandler(mock_config)
+    bot.subscribers = {111, 222, 333}
+    bot.first_subscriber = 111
+
+    mock_update = MagicMock()
+    mock_update.effective_user.id = 111
+    mock_update.message.reply_text = AsyncMock()
+
+    mock_context = MagicMock()
+    mock_context.args = ["hello"]
+
+    await bot.broadcast_command(mock_update, mock_context)
+
+    assert bot._broadcast_queue.qsize() == 2
+    mock_update.message.reply_text.assert_called_once_with(
+        "⚠️ Broadcast queued for 2 subscriber(s); "
+        "1 skipped because the delivery queue is full."
+    )
+
+
+async def test_config_reload_refreshes_script_lookups(bot, tmp_path, monkeypatch):
+    """Test that script lookups follow a hot-reloaded config."""
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(
+        "one_time_scripts:\n"
+        "  - name: health-check\n"
+        "    path: ./scripts/health_check.sh\n"
+    )
+    bot.broadcast_config_reload = AsyncMock()
+    assert bot._one_time_by_name == {}
+
+    bot.config_file_path = str(config_file)
+    bot.config_last_modified = 0
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test_token")
+    await bot.check_config_changes()
+
+    bot.broadcast_config_reload.assert_called_once_with(success=True)
+    assert list(bot._one_time_by_name) == ["health-check"]
+
+
+def test_escape_markdown_escapes_legacy_markdown_characters():
+    """Test that only legacy Markdown special characters are escaped."""
+    assert escape_markdown("disk_usage: 95.5% (sda-1)") == "disk\\_usage: 95.5% (sda-1)"
+    assert escape_markdown("[a]_b*`c`") == "\\[a]\\_b\\*\\`c\\`"
+    assert escape_markdown("plain text") == "plain text"
+
+
+async def test_config_touch_without_changes_does_not_reload(mock_config, tmp_path, monkeypatch):
+    """Test that a newer mtime with identical contents skips the reload."""
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("one_time_scripts: []\n")
+    monkeypatch.setenv("CONFIG_FILE", str(config_file))
+    bot = OctopusBotHandler(mock_config)
+    bot.broadcast_config_reload = AsyncMock()
+
+    bot.config_last_modified -= 10
+    await bot.check_config_changes()
+
+    bot.broadcast_config_reload.assert_not_called()
+    assert bot.config_last_modified == os.path.getmtime(config_file)
+
+
+async def test_config_polling_debounces_burst_writes(mock_config, tmp_path, monkeypatch):
+    """Test that several quick writes to the config file cause a single reload."""
+    monkeypatch.setattr("octopus_bot.bot.CONFIG_POLL_INTERVAL", 0.01)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("one_time_scripts: []\n")
+    monkeypatch.setenv("CONFIG_FILE", str(config_file))
+    bot = OctopusBotHandler(replace(mock_config, config_debounce_seconds=0.1))
+    reloads = []
+
+    async def fake_check_config_changes():
+        reloads.append(os.path.getmtime(config_file))
+        bot.config_last_modified = reloads[-1]
+
+    bot.check_config_changes = fake_check_config_changes
+
+    monitor = asyncio.create_task(bot._poll_config_file())
+    start = bot.config_last_modified
+    for step in range(1, 4):
+        os.utime(config_file, (start + step, start + step))
+        await asyncio.sleep(0.03)
+    await asyncio.sleep(0.3)
+    monitor.cancel()
+
+    assert reloads == [start + 3]
+
+
+async def test_config_monitor_reloads_on_file_event(mock_config, tmp_path, monkeypatch):
+    """Test that the watchfiles-based monitor reloads when the config file changes."""
+    pytest.importorskip("watchfiles")
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("one_time_scripts: []\n")
+    (tmp_path / "other.txt").write_text("")
+    monkeypatch.setenv("CONFIG_FILE", str(config_file))
+    bot = OctopusBotHandler(replace(mock_config, config_debounce_seconds=0.05))
+    bot.check_config_changes = AsyncMock()
+
+    monitor = asyncio.create_task(bot._run_config_monitor())
+    await asyncio.sleep(0.2)
+    # Changes to other files in the directory are ignored
+    (tmp_path / "other.txt").write_text("changed")
+    await asyncio.sleep(0.3)
+    assert bot.check_config_changes.call_count == 0
+    config_file.write_text("one_time_scripts: []\nperiodic_scripts: []\n")
+    for _ in range(100):
+        if bot.check_config_changes.call_count:
+            break
+        await asyncio.sleep(0.02)
+    monitor.cancel()
+
+    bot.check_config_changes.assert_called_once()
+
+
+async def test_config_monitor_waits_for_writes_to_settle(mock_config, tmp_path, monkeypatch):
+    """Test that writes spaced by less than the debounce cause a single watchfiles reload."""
+    pytest.importorskip("watchfiles")
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("one_time_scripts: []\n")
+    monkeypatch.setenv("CONFIG_FILE", str(config_file))
+    bot = OctopusBotHandler(replace(mock_config, config_debounce_seconds=0.5))
+    bot.check_config_changes = AsyncMock()
+
+    monitor = asyncio.create_task(bot._run_config_monitor())
+    await asyncio.sleep(0.2)
+    # Further apart than watchfiles' default 50 ms step, closer than the debounce
+    config_file.write_text("one_time_scripts: []\nperiodic_scripts: []\n")
+    await asyncio.sleep(0.2)
+    config_file.write_text("one_time_scripts: []\n")
+    await asyncio.sleep(1.0)
+    monitor.cancel()
+
+    bot.check_config_changes.assert_called_once()
+
+
+def _mock_lifecycle(app):
+    """Make the mock Application's startup and shutdown calls awaitable."""
+    app.initialize = AsyncMock()
+    app.start = AsyncMock()
+    app.stop = AsyncMock()
+    app.shutdown = AsyncMock()
+    app.bot.get_me = AsyncMock(return_value=MagicMock(username="bot", id=1))
+    app.updater.start_polling = AsyncMock()
+    app.updater.stop = AsyncMock()
+    app.updater.running = True
+
+
+async def test_start_shuts_down_when_a_background_task_fails(bot):
+    """Test that a crashing background task cancels the others and shuts the app down."""
+    _mock_lifecycle(bot.app)
+    bot._run_config_monitor = AsyncMock(side_effect=RuntimeError("boom"))
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        await bot.start()
+
+    assert excinfo.group_contains(RuntimeError)
+    bot.app.updater.stop.assert_awaited_once()
+    bot.app.stop.assert_awaited_once()
+    bot.app.shutdown.assert_awaited_once()
+
+
+async def test_status_command_reports_cpu_and_each_disk(mock_config):
+    """Test that /status reports CPU load and every disk, including failed ones."""
+    bot = OctopusBotHandler(replace(mock_config, monitored_devices=[
+        DeviceMonitor(name="root", path="/", alert_threshold=80),
+        DeviceMonitor(name="data", path="/data", alert_threshold=50),
+        DeviceMonitor(name="gone", path="/gone", alert_threshold=80),
+    ]))
+
+    def fake_get_disk_usage(path, max_age=0):
+        if path == "/gone":
+            raise FileNotFoundError("no such mount")
+        return {"/": 40.0, "/data": 75.0}[path]
+
+    mock_update = MagicMock()
+    mock_update.message.reply_text = AsyncMock()
+    mock_context = MagicMock()
+    mock_context.args = []
+
+    with patch("octopus_bot.bot.get_disk_usage", side_effect=fake_get_disk_usage), \
+         patch("octopus_bot.bot.get_cpu_load", return_value={"1min": 0.5, "5min": 0.25, "15min": 0.1}):
+        await bot.status_command(mock_update, mock_context)
+
+    status_msg = mock_update.message.reply_text.call_args.args[0]
+    assert status_msg.startswith(
+        "📊 **Server Status**\n\n"
+        "🖥️ **CPU Load**\n  1min: 0.50\n  5min: 0.25\n  15min: 0.10\n\n"
+        "💾 **Disk Usage**\n"
+    )
+    assert "🟢 root: 40.0%" in status_msg
+    assert "🔴 data: 75.0% (⚠️ Alert threshold: 50%)" in status_msg
+    assert "⚠️ gone: Error - no such mount" in status_msg
+
+
+async def test_run_streaming_flushes_by_time_and_keeps_order(mock_config, monkeypatch):
+    """Test that /stream output is flushed after the interval and sent in order."""
+    monkeypatch.setattr("octopus_bot.bot.STREAM_FLUSH_INTERVAL", 0.05)
+    config = replace(
+        mock_config,
+        long_running_scripts=[Script(name="job", path="./job.sh", long_running=True)],
+    )
+
+    async def fake_run_script_streaming(script):
+        yield "a"
+        yield "b"
+        await asyncio.sleep(0.1)
+        yield "c"
+        yield "d"
+
+    monkeypatch.setattr("octopus_bot.bot.run_script_streaming", fake_run_script_streaming)
+    bot = OctopusBotHandler(config)
+    replies = []
+
+    async def slow_reply_text(text, parse_mode=None):
+        await asyncio.sleep(0.02)
+        replies.append(text)
+
+    mock_update = MagicMock()
+    mock_update.message.reply_text = slow_reply_text
+
+    await bot.run_streaming(mock_update, "job")
+
+    assert replies == [
+        "▶️ Starting long-running script 'job'...",
+        "📄 Output:\n```\na\nb\n```",
+        "📄 Output:\n```\nc\nd\n```",
+        "✅ Script 'job' completed.",
+    ]
+
+
+async def test_run_streaming_coalesces_output_during_slow_sends(mock_config, monkeypatch):
+    """Test that lines read while a send is in flight go out together in the next one."""
+    monkeypatch.setattr("octopus_bot.bot.STREAM_FLUSH_INTERVAL", 0)
+    config = replace(
+        mock_config,
+        long_running_scripts=[Script(name="job", path="./job.sh", long_running=True)],
+    )
+
+    async def fake_run_script_streaming(script):
+        for i in range(6):
+            yield str(i)
+            await asyncio.sleep(0.01)
+
+    monkeypatch.setattr("octopus_bot.bot.run_script_streaming", fake_run_script_streaming)
+    bot = OctopusBotHandler(config)
+    replies = []
+
+    async def slow_reply_text(text, parse_mode=None):
+        await asyncio.sleep(0.035)
+        replies.append(text)
+
+    mock_update = MagicMock()
+    mock_update.message.reply_text = slow_reply_text
+
+    await bot.run_streaming(mock_update, "job")
+
+    # Every line arrives once and in order, but in fewer messages than lines
+    outputs = replies[1:-1]
+    assert len(outputs) < 6
+    assert [line for o in outputs for line in o.split("\n")[2:-1]] == ["0", "1", "2", "3", "4", "5"]
+
+
+async def test_run_streaming_stops_reading_when_a_send_fails(mock_config, monkeypatch):
+    """Test that a failed send stops the script's output being read and is reported."""
+    config = replace(
+        mock_config,
+        long_running_scripts=[Script(name="job", path="./job.sh", long_running=True)],
+    )
+    read = []
+    closed = asyncio.Event()
+
+    async def endless_run_script_streaming(script):
+        try:
+            while True:
+                read.append(len(read))
+                yield "x" * 100
+                await asyncio.sleep(0)
+        finally:
+            closed.set()
+
+    monkeypatch.setattr("octopus_bot.bot.run_script_streaming", endless_run_script_streaming)
+    bot = OctopusBotHandler(config)
+    bot.chunk_size = 250
+
+    async def reply_text(text, parse_mode=None):
+        if text.startswith("📄"):
+            raise Exception("Bad Request: can't parse entities")
+
+    mock_update = MagicMock()
+    mock_update.message.reply_text = AsyncMock(side_effect=reply_text)
+
+    await asyncio.wait_for(bot.run_streaming(mock_update, "job"), timeout=1)
+    await asyncio.wait_for(closed.wait(), timeout=1)
+
+    mock_update.message.reply_text.assert_called_with("❌ Error: Bad Request: can't parse entities")
+    # Reading stopped after about one message's worth of output
+    assert len(read) < 10
+
+
+async def test_stop_ends_start_and_shuts_down(bot):
+    """Test that stop() makes start() cancel its tasks and shut the app down."""
+    _mock_lifecycle(bot.app)
+
+    starter = asyncio.create_task(bot.start())
+    await asyncio.sleep(0.05)
+    await bot.stop()
+    await asyncio.wait_for(starter, timeout=1)
+
+    bot.app.updater.stop.assert_awaited_once()
+    bot.app.shutdown.assert_awaited_once()
+
+
+async def test_stop_delivers_queued_broadcasts_first(bot):
+    """Test that shutdown waits for queued /broadcast deliveries before stopping the workers."""
+    _mock_lifecycle(bot.app)
+
+    delivered = []
+
+    async def slow_send(**kwargs):
+        await asyncio.sleep(0.05)
+        delivered.append(kwargs["chat_id"])
+
+    bot.app.bot.send_message = slow_send
+
+    starter = asyncio.create_task(bot.start())
+    await asyncio.sleep(0.05)
+    for user_id in (111, 222):
+        bot._broadcast_queue.put_nowait((user_id, [("hello", None)], None))
+    await bot.stop()
+    await asyncio.wait_for(starter, timeout=1)
+
+    assert sorted(delivered) == [111, 222]
+
+
+def test_chunk_text_splits_at_line_breaks():
+    """Test that long output is split at newlines and long lines are hard-split."""
+    assert _chunk_text("short", 10) == ["short"]
+    assert _chunk_text("aaa\nbbb\nccc", 7) == ["aaa\nbbb", "ccc"]
+    assert _chunk_text("abcdefghij", 4) == ["abcd", "efgh", "ij"]
+    assert "".join(_chunk_text("x" * 9000, 4000)) == "x" * 9000
@@ -1,15 +1,14 @@
 """Unit tests for configuration loading."""
 
-import os
-import tempfile
-from pathlib import Path
+from unittest.mock import patch
 
 import pytest
+import yaml
 
 from octopus_bot.config import BotConfig, DeviceMonitor, Script, load_config
 
 
-def test_load_config_valid():
+def test_load_config_valid(tmp_path, monkeypatch):
     """Test loading valid configuration."""
     config_content = """
 long_running_scripts:
@@ -26,28 +25,27 @@ monitored_devices:
     alert_threshold: 85
 """
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        config_file = Path(tmpdir) / "config.yaml"
-        config_file.write_text(config_content)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(config_content)
 
-        os.environ["TELEGRAM_TOKEN"] = "test_token"
-        config = load_config(str(config_file))
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test_token")
+    config = load_config(str(config_file))
 
-        assert config.telegram_token == "test_token"
-        assert len(config.long_running_scripts) == 1
-        assert config.long_running_scripts[0].name == "deploy"
-        assert config.long_running_scripts[0].long_running is True
+    assert config.telegram_token == "test_token"
+    assert len(config.long_running_scripts) == 1
+    assert config.long_running_scripts[0].name == "deploy"
+    assert config.long_running_scripts[0].long_running is True
 
-        assert len(config.one_time_scripts) == 1
-        assert config.one_time_scripts[0].name == "health-check"
-        assert config.one_time_scripts[0].long_running is False
+    assert len(config.one_time_scripts) == 1
+    assert config.one_time_scripts[0].name == "health-check"
+    assert config.one_time_scripts[0].long_running is False
 
-        assert len(config.monitored_devices) == 1
-        assert config.monitored_devices[0].name == "root"
-        assert config.monitored_devices[0].alert_threshold == 85
+    assert len(config.monitored_devices) == 1
+    assert config.monitored_devices[0].name == "root"
+    assert config.monitored_devices[0].alert_threshold == 85
 
 
-def test_load_config_missing_token():
+def test_load_config_missing_token(tmp_path, monkeypatch):
     """Test that loading config without TELEGRAM_TOKEN raises error."""
     config_content = """
 long_running_scripts: []
@@ -55,38 +53,36 @@ one_time_scripts: []
 monitored_devices: []
 """
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        config_file = Path(tmpdir) / "config.yaml"
-        config_file.write_text(config_content)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(config_content)
 
-        # Make sure TELEGRAM_TOKEN is not set
-        os.environ.pop("TELEGRAM_TOKEN", None)
+    # Make sure TELEGRAM_TOKEN is not set
+    monkeypatch.delenv("TELEGRAM_TOKEN", raising=False)
 
-        with pytest.raises(ValueError, match="TELEGRAM_TOKEN"):
-            load_config(str(config_file))
+    with pytest.raises(ValueError, match="TELEGRAM_TOKEN"):
+        load_config(str(config_file))
 
 
-def test_load_config_file_not_found():
+def test_load_config_file_not_found(monkeypatch):
     """Test that loading non-existent config raises error."""
-    os.environ["TELEGRAM_TOKEN"] = "test_token"
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test_token")
 
     with pytest.raises(FileNotFoundError):
         load_config("/nonexistent/config.yaml")
 
 
-def test_load_config_empty_file():
+def test_load_config_empty_file(tmp_path, monkeypatch):
     """Test that loading empty config raises error."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        config_file = Path(tmpdir) / "config.yaml"
-        config_file.write_text("")
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("")
 
-        os.environ["TELEGRAM_TOKEN"] = "test_token"
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test_token")
 
-        with pytest.raises(ValueError, match="empty"):
-            load_config(str(config_file))
+    with pytest.raises(ValueError, match="empty"):
+        load_config(str(config_file))
 
 
-def test_default_alert_threshold():
+def test_default_alert_threshold(tmp_path, monkeypatch):
     """Test that default alert threshold is 80."""
     config_content = """
 long_running_scripts: []
@@ -96,17 +92,16 @@ monitored_devices:
     path: /
 """
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        config_file = Path(tmpdir) / "config.yaml"
-        config_file.write_text(config_content)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(config_content)
 
-        os.environ["TELEGRAM_TOKEN"] = "test_token"
-        config = load_config(str(config_file))
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test_token")
+    config = load_config(str(config_file))
 
-        assert config.monitored_devices[0].alert_threshold == 80
+    assert config.monitored_devices[0].alert_threshold == 80
 
 
-def test_load_config_with_periodic_scripts():
+def test_load_config_with_periodic_scripts(tmp_path, monkeypatch):
     """Test loading configuration with periodic scripts."""
     config_content = """
 long_running_scripts: []
@@ -121,15 +116,48 @@ periodic_scripts:
     interval: 86400
 """
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        config_file = Path(tmpdir) / "config.yaml"
-        config_file.write_text(config_content)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(config_content)
+
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test_token")
+    config = load_config(str(config_file))
+
+    assert len(config.periodic_scripts) == 2
+    assert config.periodic_scripts[0].name == "hourly-health"
+    assert config.periodic_scripts[0].interval == 3600
+    assert config.periodic_scripts[1].name == "daily-backup"
+    assert config.periodic_scripts[1].interval == 86400
+
+
+def test_load_config_reparses_only_when_file_changes(tmp_path, monkeypatch):
+    """Test that an unchanged config file is parsed once and re-parsed after edits."""
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("one_time_scripts: []\n")
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test_token")
+
+    with patch("octopus_bot.config.yaml.load", wraps=yaml.load) as mock_load:
+        load_config(str(config_file))
+        load_config(str(config_file))
+        assert mock_load.call_count == 1
+
+        config_file.write_text("one_time_scripts:\n  - name: a\n    path: ./a.sh\n")
+        config = load_config(str(config_file))
+        assert mock_load.call_count == 2
+        assert [s.name for s in config.one_time_scripts] == ["a"]
+
+
+def test_load_config_warns_about_missing_scripts(tmp_path, caplog, monkeypatch):
+    """Test that scripts whose path doesn't exist are reported when loading."""
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(
+        "one_time_scripts:\n"
+        "  - name: missing\n"
+        "    path: /nonexistent/missing.sh\n"
+    )
+    monkeypatch.setenv("TELEGRAM_TOKEN", "test_token")
 
-        os.environ["TELEGRAM_TOKEN"] = "test_token"
+    with caplog.at_level("WARNING", logger="octopus_bot.config"):
         config = load_config(str(config_file))
 
-        assert len(config.periodic_scripts) == 2
-        assert config.periodic_scripts[0].name == "hourly-health"
-        assert config.periodic_scripts[0].interval == 3600
-        assert config.periodic_scripts[1].name == "daily-backup"
-        assert config.periodic_scripts[1].interval == 86400
\ No newline at end of file
+    assert config.one_time_scripts[0].name == "missing"
+    assert "Script 'missing' not found: /nonexistent/missing.sh" in caplog.text
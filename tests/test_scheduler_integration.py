@@ -1,80 +1,176 @@
 """Integration test: verify that periodic scheduling triggers script execution and broadcasting."""
 
 import asyncio
-import os
-import tempfile
-from pathlib import Path
-
-import schedule
-
-from octopus_bot.config import load_config
-
-
-def test_schedule_triggers_execute_and_broadcast(monkeypatch):
+from datetime import datetime, timedelta
+
+import pytest
+
+from octopus_bot import bot as bot_module
+from octopus_bot.bot import OctopusBotHandler, _seconds_until
+from octopus_bot.config import BotConfig, PeriodicScript
+
+
+@pytest.fixture
+def handler():
+    """Create a handler with one fast periodic script."""
+    config = BotConfig(
+        telegram_token="test_token",
+        long_running_scripts=[],
+        one_time_scripts=[],
+        monitored_devices=[],
+        periodic_scripts=[
+            PeriodicScript(name="test-job", path="./scripts/health_check.sh", interval=0.05)
+        ],
+    )
+    handler = OctopusBotHandler(config)
+    yield handler
+    # Don't leave periodic tasks running into later tests
+    handler._clear_scheduled_jobs()
+
+
+async def test_schedule_triggers_execute_and_broadcast(handler, monkeypatch):
     """Schedule a periodic script and ensure it runs and broadcasts output.
 
-    This test schedules a job, runs all scheduled jobs inside an asyncio event
-    loop (so that `asyncio.create_task` works), and patches the bot's
-    `run_script_once` and the handler's `broadcast_output` to observe calls.
+    This test schedules a job with a short interval inside an asyncio event
+    loop (the scheduler spawns one task per script), and patches the bot's
+    `run_script_streaming` and the handler's `broadcast_chunks` to observe calls.
     """
 
-    config_content = """
-long_running_scripts: []
-one_time_scripts: []
-monitored_devices: []
-periodic_scripts:
-  - name: test-job
-    path: ./scripts/health_check.sh
-    interval: 1
-"""
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        config_file = Path(tmpdir) / "config.yaml"
-        config_file.write_text(config_content)
-
-        os.environ["TELEGRAM_TOKEN"] = "test_token"
-        config = load_config(str(config_file))
-
-        # Create handler
-        from octopus_bot.bot import OctopusBotHandler
-        from octopus_bot import bot as bot_module
-
-        handler = OctopusBotHandler(config)
-
-        # Patch the run_script_streaming used inside bot module
-        async def fake_run_script_streaming(script):
-            # async generator yielding one line
-            yield "fake-output"
-
-        monkeypatch.setattr(bot_module, "run_script_streaming", fake_run_script_streaming)
-
-        broadcasts = []
-
-        async def fake_broadcast_chunks(title, chunks, send_title=True):
-            # collect joined chunks for assertion
-            broadcasts.append((title, "\n".join(chunks)))
-
-        # Patch the instance method
-        monkeypatch.setattr(handler, "broadcast_chunks", fake_broadcast_chunks)
-
-        # Ensure no leftover scheduled jobs
-        schedule.clear()
-
-        # Schedule jobs on the handler (schedules via schedule.every(...).seconds.do)
-        handler._schedule_periodic_scripts()
-
-        async def runner():
-            # Run all scheduled jobs immediately inside the running event loop
-            schedule.run_all(delay_seconds=0)
-
-            # Give control back to the event loop to allow created tasks to run
-            await asyncio.sleep(0.2)
-
-        # Execute runner in event loop
-        asyncio.run(runner())
+    # Patch the run_script_streaming used inside bot module
+    async def fake_run_script_streaming(script):
+        # async generator yielding one line
+        yield "fake-output"
+
+    monkeypatch.setattr(bot_module, "run_script_streaming", fake_run_script_streaming)
+
+    broadcasts = []
+    broadcast_done = asyncio.Event()
+
+    async def fake_broadcast_chunks(title, chunks, send_title=True):
+        # collect joined chunks for assertion
+        broadcasts.append((title, "\n".join(chunks)))
+        broadcast_done.set()
+
+    # Patch the instance method
+    monkeypatch.setattr(handler, "broadcast_chunks", fake_broadcast_chunks)
 
-        # Verify that broadcast was called
-        assert len(broadcasts) >= 1
-        title, output = broadcasts[0]
-        assert "test-job" in title
-        assert "fake-output" in output
+    # Scheduling creates tasks, so it must happen inside the running loop
+    handler._schedule_periodic_scripts()
+    assert set(handler._periodic_tasks) == {"test-job"}
+
+    # Wait for the periodic task to fire once
+    await asyncio.wait_for(broadcast_done.wait(), timeout=1.0)
+
+    handler._clear_scheduled_jobs()
+
+    # Verify that broadcast was called
+    assert len(broadcasts) >= 1
+    title, output = broadcasts[0]
+    assert "test-job" in title
+    assert "fake-output" in output
+    assert handler._periodic_tasks == {}
+
+
+async def test_reload_lets_a_running_periodic_script_finish(handler):
+    """Rescheduling cancels the timers but not a run that is in progress."""
+    started = asyncio.Event()
+    release = asyncio.Event()
+    runs = []
+
+    async def blocking_execute(script_name):
+        runs.append(script_name)
+        started.set()
+        await release.wait()
+        runs.append("done")
+
+    handler.execute_periodic_script = blocking_execute
+
+    handler._schedule_periodic_scripts()
+    await asyncio.wait_for(started.wait(), timeout=1.0)
+    run = handler._periodic_runs["test-job"]
+
+    handler._reschedule_periodic_scripts()
+    # The new timer fires meanwhile but waits for the old run instead of starting another
+    await asyncio.sleep(0.1)
+    assert runs == ["test-job"]
+
+    release.set()
+    await asyncio.wait_for(run, timeout=1.0)
+    assert runs[:2] == ["test-job", "done"]
+    await handler._cancel_periodic_runs()
+
+
+async def test_unparseable_time_falls_back_to_interval():
+    """A non-string daily time is logged and the remaining scripts still get scheduled."""
+    config = BotConfig(
+        telegram_token="test_token",
+        long_running_scripts=[],
+        one_time_scripts=[],
+        monitored_devices=[],
+        periodic_scripts=[
+            # YAML parses an unquoted `time: 12:30` as the integer 750
+            PeriodicScript(name="bad-time", path="./a.sh", interval=60, time=750),
+            PeriodicScript(name="later", path="./b.sh", interval=60),
+        ],
+    )
+    handler = OctopusBotHandler(config)
+
+    handler._schedule_periodic_scripts()
+    try:
+        assert set(handler._periodic_tasks) == {"bad-time", "later"}
+    finally:
+        handler._clear_scheduled_jobs()
+
+
+def test_seconds_until_wraps_to_next_day():
+    """Daily schedules fire later today, or tomorrow if the time has passed."""
+    now = datetime.now()
+
+    later = (now + timedelta(minutes=5)).time()
+    assert 0 < _seconds_until(later) <= 5 * 60
+
+    earlier = (now - timedelta(minutes=5)).time()
+    assert 24 * 3600 - 5 * 60 - 1 <= _seconds_until(earlier) <= 24 * 3600
+
+
+async def test_interval_schedule_does_not_drift_with_run_time():
+    """Interval runs start on a fixed grid even when each run takes a while."""
+    config = BotConfig(
+        telegram_token="test_token",
+        long_running_scripts=[],
+        one_time_scripts=[],
+        monitored_devices=[],
+        periodic_scripts=[],
+    )
+    handler = OctopusBotHandler(config)
+
+    # Virtual clock: sleeping advances it instantly, so the run is deterministic
+    now = 0.0
+
+    async def fake_sleep(delay):
+        nonlocal now
+        now += delay
+        await asyncio.sleep(0)
+
+    started = []
+
+    async def slow_execute(script_name):
+        nonlocal now
+        started.append(now)
+        # The third run overruns the interval
+        now += 0.06 if len(started) < 3 else 0.25
+
+    handler.execute_periodic_script = slow_execute
+
+    task = asyncio.create_task(
+        handler._run_every("job", 0.1, clock=lambda: now, sleep=fake_sleep)
+    )
+    for _ in range(100):
+        if len(started) == 4:
+            break
+        await asyncio.sleep(0)
+    task.cancel()
+
+    # Sleeping a full interval after each run would space starts 0.16 s apart;
+    # a run longer than the interval skips the missed slot instead of bunching
+    assert started == pytest.approx([0.1, 0.2, 0.3, 0.6])
@@ -1,55 +1,85 @@
 """Unit tests for server operations."""
 
-import asyncio
-import tempfile
-from pathlib import Path
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from octopus_bot.config import Script
 from octopus_bot.server_ops import (
+    get_cpu_load,
     get_disk_usage,
     run_script_once,
     run_script_streaming,
 )
 
 
-@pytest.mark.asyncio
-async def test_run_script_streaming():
+def fake_process(chunks, returncode=0):
+    """Build a stand-in for asyncio.subprocess.Process whose stdout yields chunks."""
+    process = MagicMock(returncode=returncode)
+    process.stdout.read = AsyncMock(side_effect=[*chunks, b""])
+    process.wait = AsyncMock(return_value=returncode)
+    process.communicate = AsyncMock(return_value=(b"".join(chunks), None))
+    return process
+
+
+async def test_run_script_streaming(monkeypatch):
     """Test streaming script execution."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        script_path = Path(tmpdir) / "test_script.sh"
-        script_path.write_text("#!/bin/bash\necho 'line1'\necho 'line2'")
-        script_path.chmod(0o755)
+    fake_exec = AsyncMock(return_value=fake_process([b"line1\nli", b"ne2\n"]))
+    monkeypatch.setattr("octopus_bot.server_ops.asyncio.create_subprocess_exec", fake_exec)
+
+    script = Script(name="test", path="./test_script.sh", long_running=True, args=["-v"])
+
+    lines = []
+    async for line in run_script_streaming(script):
+        lines.append(line)
+
+    assert lines == ["line1", "line2"]
+    assert fake_exec.call_args.args == ("test_script.sh", "-v")
 
-        script = Script(name="test", path=str(script_path), long_running=True)
 
-        lines = []
-        async for line in run_script_streaming(script):
-            lines.append(line)
+async def test_run_script_streaming_kills_script_when_closed_early(monkeypatch):
+    """Test that the script is killed and reaped if the caller stops reading."""
+    process = fake_process([b"line1\n", b"line2\n"], returncode=None)
+    fake_exec = AsyncMock(return_value=process)
+    monkeypatch.setattr("octopus_bot.server_ops.asyncio.create_subprocess_exec", fake_exec)
 
-        assert len(lines) >= 2
-        assert "line1" in lines[0]
-        assert "line2" in lines[1]
+    script = Script(name="test", path="./test_script.sh", long_running=True)
 
+    stream = run_script_streaming(script)
+    assert await anext(stream) == "line1"
+    await stream.aclose()
 
-@pytest.mark.asyncio
-async def test_run_script_once():
+    process.kill.assert_called_once()
+    process.wait.assert_awaited_once()
+
+
+async def test_run_script_once(monkeypatch):
     """Test one-time script execution."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        script_path = Path(tmpdir) / "test_script.sh"
-        script_path.write_text("#!/bin/bash\necho 'test output'")
-        script_path.chmod(0o755)
+    fake_exec = AsyncMock(return_value=fake_process([b"test output\n"]))
+    monkeypatch.setattr("octopus_bot.server_ops.asyncio.create_subprocess_exec", fake_exec)
+
+    script = Script(name="test", path="./test_script.sh", long_running=False)
 
-        script = Script(name="test", path=str(script_path), long_running=False)
+    output = await run_script_once(script)
 
-        output = await run_script_once(script)
+    assert output == "test output\n"
 
-        assert "test output" in output
 
+async def test_run_script_missing_path_raises_script_not_found(monkeypatch):
+    """Test that a failed exec of a missing script is reported as 'Script not found'."""
+    fake_exec = AsyncMock(side_effect=FileNotFoundError)
+    monkeypatch.setattr("octopus_bot.server_ops.asyncio.create_subprocess_exec", fake_exec)
 
-@pytest.mark.asyncio
+    script = Script(name="test", path="/nonexistent/script.sh", long_running=False)
+
+    with pytest.raises(FileNotFoundError, match="Script not found: /nonexistent/script.sh"):
+        await run_script_once(script)
+    with pytest.raises(FileNotFoundError, match="Script not found: /nonexistent/script.sh"):
+        async for _ in run_script_streaming(script):
+            pass
+
+
+@pytest.mark.slow
 async def test_run_script_not_found():
     """Test that running non-existent script raises error."""
     script = Script(
@@ -65,14 +95,54 @@ async def test_run_script_not_found():
 def test_get_disk_usage():
     """Test disk usage retrieval."""
     # Test with root directory which should always exist
-    usage_percent, free_percent = get_disk_usage("/")
+    usage_percent = get_disk_usage("/")
 
     assert 0 <= usage_percent <= 100
-    assert 0 <= free_percent <= 100
-    assert usage_percent + free_percent == 100
 
 
 def test_get_disk_usage_invalid_path():
     """Test disk usage with invalid path."""
-    with pytest.raises(RuntimeError):
+    with pytest.raises(FileNotFoundError):
         get_disk_usage("/nonexistent/path")
+
+
+def test_get_disk_usage_reuses_recent_reading(monkeypatch):
+    """Test that disk usage is read once per path within max_age."""
+    monkeypatch.setattr("octopus_bot.server_ops._disk_cache", {})
+    usage = MagicMock(percent=42.0)
+    with patch("octopus_bot.server_ops.psutil.disk_usage", return_value=usage) as mock_disk_usage:
+        assert get_disk_usage("/cached", max_age=60) == 42.0
+        assert get_disk_usage("/cached", max_age=60) == 42.0
+        assert mock_disk_usage.call_count == 1
+
+        # max_age=0 (the default) always takes a fresh reading
+        get_disk_usage("/cached")
+        assert mock_disk_usage.call_count == 2
+
+
+def test_get_cpu_load_reuses_recent_reading(monkeypatch):
+    """Test that load averages are read once within max_age."""
+    monkeypatch.setattr("octopus_bot.server_ops._cpu_cache", None)
+    with patch("octopus_bot.server_ops.os.getloadavg", return_value=(1.0, 2.0, 3.0)) as mock_loadavg:
+        first = get_cpu_load(max_age=60)
+        first["1min"] = 99.0  # callers can't corrupt the cached reading
+        assert get_cpu_load(max_age=60) == {"1min": 1.0, "5min": 2.0, "15min": 3.0}
+        assert mock_loadavg.call_count == 1
+
+
+@pytest.mark.slow
+async def test_run_script_streaming_splits_batched_output(tmp_path):
+    """Test that output read in large batches is still yielded line by line."""
+    script_path = tmp_path / "test_script.sh"
+    script_path.write_text(
+        "#!/bin/bash\nfor i in $(seq 1 5000); do echo \"line $i\"; done\necho ''\nprintf 'tail'"
+    )
+    script_path.chmod(0o755)
+
+    script = Script(name="test", path=str(script_path), long_running=True)
+
+    lines = [line async for line in run_script_streaming(script)]
+
+    assert lines[:2] == ["line 1", "line 2"]
+    assert lines[4999] == "line 5000"
+    assert lines[5000:] == ["", "tail"]